@@ -0,0 +1,312 @@
+import pandas as pd
+import pandas_ta_classic as ta
+from backtesting import Backtest, Strategy
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import argparse
+import csv
+import os
+import signal
+import time
+import traceback
+
+from price_store import get_history
+from profiling import Profiler, get_profiler, stop_tracing
+from signal_store import latest_scan_dates, OVERSOLD_SOURCE, DB_FILE
+
+# --- CONFIGURATION ---
+MAX_WORKERS = os.cpu_count()
+TICKER_TIMEOUT = 120  # seconds per ticker backtest (enforced where SIGALRM exists)
+RESULTS_FILE = 'candidate_validation_v3.csv'
+ERRORS_FILE = 'candidate_validation_errors.csv'
+REPORT_COLUMNS = ['Ticker', 'Found On', 'Profit Factor', 'Win Rate (%)',
+                  'Return (%)', 'Avg Days Held', '# Trades']
+ERROR_COLUMNS = ['Ticker', 'Stage', 'Error', 'Traceback']
+PLOT_MIN_PF = 1.0  # only tickers above this profit factor get a chart
+
+
+# --- 1. The Strategy Logic ---
+class OversoldBounce(Strategy):
+    rsi_period = 14
+    rsi_limit = 30
+    exit_rsi = 50
+    sma_filter = 200
+
+    def init(self):
+        # Reuse indicator columns precomputed by the parameter sweep (e.g. 'RSI_14', 'SMA_200')
+        # so a grid of parameter sets never recomputes the same series
+        columns = self.data.df.columns
+        rsi_col, sma_col = f"RSI_{self.rsi_period}", f"SMA_{self.sma_filter}"
+
+        if rsi_col in columns:
+            self.rsi = self.I(lambda: self.data.df[rsi_col], name=rsi_col)
+        else:
+            self.rsi = self.I(ta.rsi, self.data.Close.s, length=self.rsi_period)
+
+        if sma_col in columns:
+            self.sma = self.I(lambda: self.data.df[sma_col], name=sma_col)
+        else:
+            self.sma = self.I(ta.sma, self.data.Close.s, length=self.sma_filter)
+
+    def next(self):
+        price = self.data.Close[-1]
+
+        if not self.position:
+            # Buy if Oversold AND in Long Term Uptrend
+            if self.rsi[-1] < self.rsi_limit:
+                if len(self.sma) > 0 and price > self.sma[-1]:
+                    self.buy()
+
+        elif self.position:
+            # Sell if RSI recovers
+            if self.rsi[-1] > self.exit_rsi:
+                self.position.close()
+
+
+# --- 2. Per-Ticker Work (runs inside the process pool) ---
+class TickerTimeout(Exception):
+    pass
+
+
+def _raise_timeout(signum, frame):
+    raise TickerTimeout()
+
+
+def _run_with_timeout(func, timeout, *args):
+    # SIGALRM is per-process, so each worker can bound its own ticker.
+    # Platforms without it (Windows) run the ticker unbounded.
+    if not timeout or not hasattr(signal, 'SIGALRM'):
+        return func(*args)
+
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    signal.alarm(timeout)
+    try:
+        return func(*args)
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _add_indicators(data, timings):
+    # Precomputed under the names OversoldBounce looks for, so indicator time is measured on its own
+    start = time.perf_counter()
+    data = data.copy()
+    data[f"RSI_{OversoldBounce.rsi_period}"] = ta.rsi(data['Close'], length=OversoldBounce.rsi_period)
+    data[f"SMA_{OversoldBounce.sma_filter}"] = ta.sma(data['Close'], length=OversoldBounce.sma_filter)
+    timings['indicators'] = time.perf_counter() - start
+    return data
+
+
+def _backtest(ticker, scan_date, data, timings, results):
+    data = _add_indicators(data, timings)
+
+    start = time.perf_counter()
+    bt = Backtest(data, OversoldBounce, cash=10000, commission=.002)
+    stats = bt.run()
+    timings['Backtest.run'] = time.perf_counter() - start
+
+    avg_duration = stats['Avg. Trade Duration']
+    avg_days = avg_duration.days if hasattr(avg_duration, 'days') else 0
+    pf = stats['Profit Factor']
+    if results is not None and pf > PLOT_MIN_PF:
+        results['stats'] = stats  # handed to the plot stage, so it never re-runs the backtest
+
+    return {
+        'Ticker': ticker,
+        'Found On': scan_date,
+        'Profit Factor': round(pf, 2),
+        'Win Rate (%)': round(stats['Win Rate [%]'], 1),
+        'Return (%)': round(stats['Return [%]'], 1),
+        'Avg Days Held': avg_days,
+        '# Trades': stats['# Trades']
+    }
+
+
+def backtest_ticker(ticker, scan_date, data, timeout=TICKER_TIMEOUT, keep_stats=False):
+    # Returns (row, error, timings, stats). Exactly one of row / error is None;
+    # timings holds the seconds spent per stage in this worker. With keep_stats, 'stats'
+    # is the backtesting.py result of a ticker worth plotting (profit factor above PLOT_MIN_PF), else None.
+    timings = {}
+    results = {} if keep_stats else None
+    try:
+        row = _run_with_timeout(_backtest, timeout, ticker, scan_date, data, timings, results)
+        return row, None, timings, (results or {}).get('stats')
+    except TickerTimeout:
+        return None, {'Ticker': ticker, 'Stage': 'backtest', 'Error': f"Timed out after {timeout}s"}, timings, None
+    except Exception as e:
+        return None, {'Ticker': ticker, 'Stage': 'backtest', 'Error': f"{type(e).__name__}: {e}",
+                      'Traceback': traceback.format_exc()}, timings, None
+
+
+def plot_ticker(ticker, scan_date, data, stats, plot_folder, timeout=TICKER_TIMEOUT):
+    # Construct filename: plots/NVDA_2024-02-04_OversoldBounce
+    # Backtesting.py appends .html automatically usually, but we ensure path is clean
+    strategy_name = "OversoldBounce"
+    safe_filename = f"{plot_folder}/{ticker}_{scan_date}_{strategy_name}"
+
+    timings = {}
+
+    def _plot():
+        # 'stats' comes from the backtest stage; plotting it skips a second bt.run()
+        bt = Backtest(data, OversoldBounce, cash=10000, commission=.002)
+        start = time.perf_counter()
+        bt.plot(results=stats, filename=safe_filename, open_browser=False)
+        timings['bt.plot'] = time.perf_counter() - start
+
+    # Returns (error, timings); error is None on success
+    try:
+        _run_with_timeout(_plot, timeout)
+        return None, timings
+    except TickerTimeout:
+        return {'Ticker': ticker, 'Stage': 'plot', 'Error': f"Timed out after {timeout}s"}, timings
+    except Exception as e:
+        return {'Ticker': ticker, 'Stage': 'plot', 'Error': f"{type(e).__name__}: {e}",
+                'Traceback': traceback.format_exc()}, timings
+
+
+# --- 3. The Validation Engine ---
+def _record_error(errors, error):
+    # Appended as it happens, like the result rows, so a crash keeps every error so far
+    errors.append(error)
+    new_file = not os.path.exists(ERRORS_FILE)
+    with open(ERRORS_FILE, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=ERROR_COLUMNS, restval='')
+        if new_file:
+            writer.writeheader()
+        writer.writerow(error)
+
+
+def validate_csv_list(max_workers=MAX_WORKERS, timeout=TICKER_TIMEOUT, make_plots=True, profiler=None, provider=None):
+    profiler = get_profiler(profiler)
+
+    # A. Setup File System
+    plot_folder = 'plots'
+
+    # Create the 'plots' folder if it doesn't exist
+    if make_plots and not os.path.exists(plot_folder):
+        os.makedirs(plot_folder)
+        print(f"Created new folder: {plot_folder}/")
+
+    # A stale error file from an earlier run would look like this run's failures
+    if os.path.exists(ERRORS_FILE):
+        os.remove(ERRORS_FILE)
+
+    # B. Load and Prepare Data
+    # One grouped query: each candidate once, with its most recent scan date
+    with profiler.stage('signal query'):
+        scan_dates = latest_scan_dates(OVERSOLD_SOURCE)
+    if not scan_dates:
+        print(f"Error: no signals in '{DB_FILE}'. Run the daily scanner first "
+              f"(or import an old CSV with: python signal_store.py --import-csv oversold_history.csv).")
+        return
+
+    unique_tickers = list(scan_dates)
+
+    print(f"--- Analyzing {len(unique_tickers)} Candidates on {max_workers} workers ---")
+    if make_plots:
+        print(f"Plots will be saved to: {plot_folder}/")
+
+    # 1. Load Data (3 Years) from the local price store in one pass
+    with profiler.stage('download'):
+        price_history = get_history(unique_tickers, start=datetime.today() - timedelta(days=3 * 365),
+                                    provider=provider)
+
+    jobs = []
+    for ticker, scan_date in scan_dates.items():
+        data = price_history.get(ticker)
+        if data is None or len(data) < 250:
+            print(f"Skipping {ticker}: Not enough data.")
+            continue
+        jobs.append((ticker, scan_date, data))
+
+    report_card = []
+    errors = []
+    plot_stats = {}  # ticker -> backtest result, profitable tickers only
+
+    # 2. Run Backtests in parallel and stream every row to disk as it completes,
+    # so a crash part-way through keeps everything finished so far
+    with profiler.stage('backtests (pool)'), open(RESULTS_FILE, 'w', newline='') as f, \
+            ProcessPoolExecutor(max_workers=max_workers, initializer=stop_tracing) as pool:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        f.flush()
+
+        futures = {pool.submit(backtest_ticker, *job, timeout, make_plots): job for job in jobs}
+        for future in as_completed(futures):
+            ticker = futures[future][0]
+            try:
+                row, error, timings, stats = future.result()
+                profiler.add_timings(ticker, timings)
+                if stats is not None:
+                    plot_stats[ticker] = stats
+            except Exception as e:
+                # The worker itself died (e.g. out of memory)
+                row, error = None, {'Ticker': ticker, 'Stage': 'backtest', 'Error': f"{type(e).__name__}: {e}"}
+
+            if error:
+                _record_error(errors, error)
+                print(f"Failed to analyze {ticker}: {error['Error']}")
+                continue
+
+            writer.writerow(row)
+            f.flush()
+            report_card.append(row)
+            print(f"Processed {ticker}: PF = {row['Profit Factor']}")
+
+    # 3. PLOT AND SAVE (deferred stage, only profitable tickers)
+    if make_plots:
+        plot_jobs = [(ticker, scan_date, data, plot_stats[ticker])
+                     for ticker, scan_date, data in jobs if ticker in plot_stats]
+        print(f"\nRendering {len(plot_jobs)} plots...")
+
+        with profiler.stage('plots (pool)'), \
+                ProcessPoolExecutor(max_workers=max_workers, initializer=stop_tracing) as pool:
+            futures = {pool.submit(plot_ticker, *job, plot_folder, timeout): job for job in plot_jobs}
+            for future in as_completed(futures):
+                ticker = futures[future][0]
+                try:
+                    error, timings = future.result()
+                    profiler.add_timings(ticker, timings)
+                except Exception as e:
+                    error = {'Ticker': ticker, 'Stage': 'plot', 'Error': f"{type(e).__name__}: {e}"}
+                if error:
+                    _record_error(errors, error)
+                    print(f"Failed to plot {ticker}: {error['Error']}")
+
+    if errors:
+        print(f"\n{len(errors)} tickers failed. Details in {ERRORS_FILE}")
+
+    # --- 4. Final Report ---
+    if report_card:
+        results_df = pd.DataFrame(report_card, columns=REPORT_COLUMNS)
+        results_df = results_df.sort_values(by='Profit Factor', ascending=False)
+
+        print("\n" + "=" * 60)
+        print("CANDIDATE LEADERBOARD (Sorted by Profit Factor)")
+        print("=" * 60)
+        print(results_df.to_string(index=False))
+
+        results_df.to_csv(RESULTS_FILE, index=False)
+        if make_plots:
+            print(f"\nAnalysis complete. Check the '{plot_folder}' folder for charts.")
+        else:
+            print("\nAnalysis complete.")
+    else:
+        print("No valid results generated.")
+
+    profiler.print_report()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest every candidate in the local signal store.")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--timeout', type=int, default=TICKER_TIMEOUT, help="Seconds per ticker (0 = no limit)")
+    parser.add_argument('--no-plots', action='store_true', help="Skip the HTML plot stage")
+    parser.add_argument('--profile', action='store_true', help="Print per-stage timing and per-ticker latency")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Also record peak memory per stage (tracemalloc; slows this process, use a separate run)")
+    args = parser.parse_args()
+
+    profiler = Profiler(enabled=args.profile or args.profile_memory, track_memory=args.profile_memory)
+    validate_csv_list(max_workers=args.workers, timeout=args.timeout, make_plots=not args.no_plots,
+                      profiler=profiler)
@@ -0,0 +1,55 @@
+import pandas as pd
+from datetime import datetime
+import argparse
+
+from profiling import Profiler, get_profiler
+from screener_fetch import fetch_screeners, print_report
+from signal_store import upsert_signals, OVERSOLD_SOURCE, DB_FILE
+
+
+def run_daily_scan(profiler=None):
+    profiler = get_profiler(profiler)
+    print("--- Starting Daily Oversold Scan ---")
+
+    # 1. Define your Finviz Filters (The "Requirements")
+    # specific filters: Mid Cap+, Oversold (RSI < 30), Earnings not imminent
+    filters_dict = {
+        'Market Cap.': 'Mid ($2bln to $10bln)',
+        'RSI (14)': 'Oversold (30)',
+        'Average Volume': 'Over 500K',
+        'Relative Volume': 'Over 1'  # Panic selling check
+    }
+
+    # 2. Get the Data (rate limited, retried with backoff, cached for the day)
+    with profiler.stage('screener fetch'):
+        results, report = fetch_screeners({'Oversold': ('overview', filters_dict)})
+    print_report(report)
+
+    # 3. Check the result
+    df_results = results['Oversold']
+    if df_results is None:
+        print(f"Error fetching data: {report['Error'].iloc[0] or 'no results'}")
+        return
+    print(f"Found {len(df_results)} candidates today.")
+
+    # 4. Add "Context" (Date and Analysis columns)
+    # We add a 'Date' column so you know WHEN it was found
+    df_results['Scan_Date'] = datetime.today().strftime('%Y-%m-%d')
+
+    # 5. Save to the local signal store
+    # Keyed on (Ticker, Scan_Date), so re-running the scan on the same day updates instead of duplicating
+    with profiler.stage('signal store write'):
+        count = upsert_signals(df_results, OVERSOLD_SOURCE)
+    print(f"Saved {count} signals to {DB_FILE}")
+    profiler.print_report()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily Finviz oversold scan into the local signal store.")
+    parser.add_argument('--profile', action='store_true', help="Print per-stage timing")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Also record peak memory per stage (tracemalloc; slows this process, use a separate run)")
+    args = parser.parse_args()
+
+    profiler = Profiler(enabled=args.profile or args.profile_memory, track_memory=args.profile_memory)
+    run_daily_scan(profiler=profiler)
\ No newline at end of file
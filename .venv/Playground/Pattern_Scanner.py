@@ -0,0 +1,261 @@
+import pandas as pd
+import pandas_ta_classic as ta
+from datetime import datetime, timedelta, timezone
+import firebase_admin
+from firebase_admin import credentials, firestore
+import argparse
+import os
+import sys
+
+from candle_patterns import detect_frame_flags, PATTERN_FLAGS
+from firestore_sink import open_sink, DRY_RUN_FILE
+from price_store import get_history
+from profiling import Profiler, get_profiler
+from screener_fetch import fetch_screeners, print_report
+
+# --- CONFIGURATION ---
+PROJECT_ID = 'invest-app-479915'
+COLLECTION_NAME = 'pattern_signals'
+PATTERNS_TO_SCAN = [
+    'Hammer',
+    'Dragonfly Doji',
+    'Marubozu White',  # Strong buying pressure (Momentum)
+    'Long Lower Shadow'  # Rejection of lows (Dip Buy)
+]
+UNIVERSE_FILE = 'scan_universe.csv'  # cap-filtered universe for --local, reused across days
+UNIVERSE_MAX_AGE_DAYS = 7  # cap buckets move slowly; the trend filter is re-checked locally every run
+TREND_HISTORY_DAYS = 300  # calendar days covering the 200 bars of the SMA200 filter
+
+
+def get_db():
+    if not firebase_admin._apps:
+        cred = credentials.ApplicationDefault()
+        firebase_admin.initialize_app(cred, {'projectId': PROJECT_ID})
+    return firestore.client()
+
+
+def open_pattern_sink(dry_run_file=None):
+    # Dry runs write JSON lines locally and never touch the cloud project
+    db = None if dry_run_file else get_db()
+    return open_sink(COLLECTION_NAME, db=db, dry_run_file=dry_run_file)
+
+
+def write_pattern_docs(sink, df_results, pattern_name, scan_date, scan_timestamp):
+    # Deduplication ID, one per ticker / day / pattern
+    doc_ids = df_results['Ticker'] + f"_{scan_date}_{pattern_name.replace(' ', '')}"
+    sink.add_frame(df_results, doc_ids, numeric_columns=('RSI',),
+                   Scan_Date=scan_date,
+                   Created_At=scan_timestamp,
+                   Pattern_Type=pattern_name,
+                   Trend_Status='Above SMA200')
+    return len(df_results)
+
+
+def report_writes(sink, total_count):
+    # Counts what Firestore actually accepted, not what was queued. Returns False if any batch failed.
+    print(sink.stats())
+    if sink.failed:
+        print(f"\nFAILED: {sink.failed} of {total_count} alerts were not written ({sink.written} written).")
+        return False
+    print(f"\nSUCCESS! Wrote {sink.written} alerts.")
+    return True
+
+
+def record_fetch_and_writes(profiler, report, sink):
+    # Screener requests and Firestore batches are timed where they run; copy them into the profile
+    records = [] if report is None else report.to_dict(orient='records')
+    for record in records:
+        profiler.add_ticker('screener request', record['Request'], record['Latency (s)'])
+    for i, seconds in enumerate(sink.commit_times):
+        profiler.add_ticker('firestore batch', f"batch {i + 1}", seconds)
+
+
+def load_universe(max_age_days=UNIVERSE_MAX_AGE_DAYS, refresh=False):
+    # Returns (universe, screener report or None when served from UNIVERSE_FILE).
+    # Finviz pages the screener 20 rows at a time, so a fresh universe of 1000+ names costs
+    # dozens of requests; it is fetched at most once per 'max_age_days'.
+    if not refresh and os.path.exists(UNIVERSE_FILE):
+        age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(UNIVERSE_FILE))
+        if age < timedelta(days=max_age_days):
+            return pd.read_csv(UNIVERSE_FILE), None
+
+    results, report = fetch_screeners({'Universe': ('technical', {'Market Cap.': '+Mid (over $2bln)'})},
+                                      cache_folder=None)
+    df_universe = results['Universe']
+    if df_universe is not None and not df_universe.empty:
+        df_universe.to_csv(UNIVERSE_FILE, index=False)
+    return df_universe, report
+
+
+def drop_stale(price_history):
+    # Halted or delisted tickers keep being served from the cache (the price store stops
+    # refetching them), so their last bar can be weeks old. Only tickers with a bar for the
+    # latest session in the batch are scanned; anything else would be labelled with today's date.
+    if not price_history:
+        return price_history
+    latest_session = max(df.index[-1] for df in price_history.values())
+    fresh = {t: df for t, df in price_history.items() if df.index[-1] == latest_session}
+    if len(fresh) < len(price_history):
+        print(f"Skipping {len(price_history) - len(fresh)} tickers with no bar for {latest_session.date()}.")
+    return fresh
+
+
+def refresh_from_prices(df_universe, price_history):
+    # Today's values come from local bars, not the (up to a week old) universe file.
+    # Same units as finvizfinance: Change, Gap and SMA distances are fractions.
+    # Slow-moving columns (Beta, ATR, 52W High / Low) stay as of the universe fetch.
+    rows = {}
+    for ticker, df in price_history.items():
+        if len(df) < 200:
+            continue
+        close = df['Close']
+        rows[ticker] = {
+            'Price': close.iloc[-1],
+            'Change': close.iloc[-1] / close.iloc[-2] - 1,
+            'Change from Open': close.iloc[-1] / df['Open'].iloc[-1] - 1,
+            'Gap': df['Open'].iloc[-1] / close.iloc[-2] - 1,
+            'Volume': df['Volume'].iloc[-1],
+            'RSI': ta.rsi(close, length=14).iloc[-1],
+            'SMA20': close.iloc[-1] / close.iloc[-20:].mean() - 1,
+            'SMA50': close.iloc[-1] / close.iloc[-50:].mean() - 1,
+            'SMA200': close.iloc[-1] / close.iloc[-200:].mean() - 1
+        }
+    fresh = pd.DataFrame.from_dict(rows, orient='index')
+    df_universe = df_universe[df_universe['Ticker'].isin(fresh.index)].copy()
+    for col in fresh.columns:
+        df_universe[col] = df_universe['Ticker'].map(fresh[col])
+    return df_universe
+
+
+def run_local_scan(use_jit=False, dry_run_file=None, profiler=None, refresh_universe=False):
+    profiler = get_profiler(profiler)
+    print(f"--- 🕵️ LOCAL PATTERN SCANNER (cached universe + local prices) 🕵️ ---")
+
+    # 1. Cap-filtered universe, from UNIVERSE_FILE when it is recent enough.
+    # Not cheaper than the four Candlestick queries on a refresh day (many pages); on the
+    # other days it makes no Finviz requests at all.
+    with profiler.stage('screener fetch'):
+        df_universe, report = load_universe(refresh=refresh_universe)
+    if report is not None:
+        print_report(report)
+    if df_universe is None or df_universe.empty:
+        print(" -> No stocks found.")
+        return True
+    print(f"Universe: {len(df_universe)} stocks.")
+
+    # 2. Trend filter and today's fields from the local price store (only new bars are downloaded)
+    with profiler.stage('download'):
+        price_history = get_history(df_universe['Ticker'], start=datetime.today() - timedelta(days=TREND_HISTORY_DAYS))
+    price_history = drop_stale(price_history)
+
+    with profiler.stage('indicators'):
+        df_universe = refresh_from_prices(df_universe, price_history)
+        df_universe = df_universe[df_universe['SMA200'] > 0]
+    print(f"Above SMA200: {len(df_universe)} stocks.")
+
+    # Flags, not priority codes: like Finviz, a bar is listed under every pattern it matches
+    latest = {}
+    with profiler.stage('patterns'):
+        for ticker, df in price_history.items():
+            if len(df) > 1:
+                with profiler.ticker('patterns', ticker):
+                    latest[ticker] = int(detect_frame_flags(df.iloc[-2:], use_jit=use_jit)[-1])
+    pattern_flags = df_universe['Ticker'].map(latest).fillna(0).astype(int)
+
+    total_count = 0
+    scan_date = datetime.today().strftime('%Y-%m-%d')
+    scan_timestamp = datetime.now(timezone.utc)
+
+    with profiler.stage('firestore write'), open_pattern_sink(dry_run_file) as sink:
+        for pattern_name in PATTERNS_TO_SCAN:
+            df_results = df_universe[(pattern_flags & PATTERN_FLAGS[pattern_name]) != 0]
+            print(f"{pattern_name}: {len(df_results)} stocks.")
+            total_count += write_pattern_docs(sink, df_results, pattern_name, scan_date, scan_timestamp)
+
+    ok = report_writes(sink, total_count)
+    record_fetch_and_writes(profiler, report, sink)
+    profiler.print_report()
+    return ok
+
+
+def run_reliable_scan(dry_run_file=None, profiler=None):
+    profiler = get_profiler(profiler)
+    print(f"--- 🕵️ RELIABLE PATTERN SCANNER (Library Method) 🕵️ ---")
+
+    # We only use patterns supported by the 'Candlestick' filter in the library
+    # to avoid the "Invalid Filter" crashes.
+    patterns_to_scan = PATTERNS_TO_SCAN
+
+    # Define Filters
+    # 'Market Cap.': '+Mid (over $2bln)' includes Mid, Large, and Mega caps.
+    # All patterns are requested concurrently; the token bucket replaces the old sleep between calls.
+    requests = {
+        pattern_name: ('technical', {
+            'Market Cap.': '+Mid (over $2bln)',
+            '200-Day Simple Moving Average': 'Price above SMA200',
+            'Candlestick': pattern_name
+        })
+        for pattern_name in patterns_to_scan
+    }
+    with profiler.stage('screener fetch'):
+        results, report = fetch_screeners(requests)
+    print_report(report)
+
+    total_count = 0
+    scan_date = datetime.today().strftime('%Y-%m-%d')
+    scan_timestamp = datetime.now(timezone.utc)
+
+    # The sink flushes on exit, so alerts found before an error are still saved
+    with profiler.stage('firestore write'), open_pattern_sink(dry_run_file) as sink:
+        for pattern_name, record in zip(patterns_to_scan, report.to_dict(orient='records')):
+            print(f"\nSearching for: {pattern_name}...")
+
+            if record['Error']:
+                print(f"Error scanning for {pattern_name}: {record['Error']}")
+                continue
+
+            try:
+                df_results = results[pattern_name]
+
+                # CHECK: Did we find anything?
+                if df_results is None or df_results.empty:
+                    print(f" -> No stocks found.")
+                    continue
+
+                print(f" -> Found {len(df_results)} stocks.")
+                total_count += write_pattern_docs(sink, df_results, pattern_name, scan_date, scan_timestamp)
+
+            except Exception as e:
+                print(f"Error scanning for {pattern_name}: {e}")
+
+    ok = report_writes(sink, total_count)
+    if ok:
+        print("Check your Firestore database.")
+    record_fetch_and_writes(profiler, report, sink)
+    profiler.print_report()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scan for candlestick patterns and store them in Firestore.")
+    parser.add_argument('--local', action='store_true',
+                        help=f"Detect patterns locally over cached prices and a universe refreshed every "
+                             f"{UNIVERSE_MAX_AGE_DAYS} days, instead of one Finviz query per pattern")
+    parser.add_argument('--refresh-universe', action='store_true', help="Re-fetch the --local universe now")
+    parser.add_argument('--jit', action='store_true', help="Use the numba pattern detector (if installed)")
+    parser.add_argument('--dry-run', nargs='?', const=DRY_RUN_FILE, default=None, metavar='FILE',
+                        help=f"Write documents to a local JSON-lines file instead of Firestore (default: {DRY_RUN_FILE})")
+    parser.add_argument('--profile', action='store_true', help="Print per-stage timing and per-ticker latency")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="Also record peak memory per stage (tracemalloc; slows this process, use a separate run)")
+    args = parser.parse_args()
+
+    profiler = Profiler(enabled=args.profile or args.profile_memory, track_memory=args.profile_memory)
+    if args.local:
+        ok = run_local_scan(use_jit=args.jit, dry_run_file=args.dry_run, profiler=profiler,
+                            refresh_universe=args.refresh_universe)
+    else:
+        ok = run_reliable_scan(dry_run_file=args.dry_run, profiler=profiler)
+    # Non-zero so cron / CI notice failed Firestore batches
+    if not ok:
+        sys.exit(1)
@@ -0,0 +1,155 @@
+import pandas as pd
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta, timezone
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from synthetic_data import make_universe, make_signals
+from profiling import Profiler, stop_tracing
+from signal_store import upsert_signals, OVERSOLD_SOURCE, EVENTS_SOURCE
+from firestore_sink import open_sink
+from compare_strategies import run_full_deduped_fixed
+from Backtest_Oversold_History import validate_csv_list, MAX_WORKERS
+
+# --- CONFIGURATION ---
+TICKER_SIZES = [100, 1_000, 5_000]
+N_BARS = 800  # a bit over 3 years of business days, enough for validate_csv_list
+SIGNALS_PER_TICKER = 5
+PLOT_UP_TO = 1_000  # bt.plot writes one HTML file per profitable ticker; skip it on bigger universes
+STAGES_FILE = 'bench_pipeline_stages.csv'
+LATENCY_FILE = 'bench_pipeline_latency.csv'
+
+
+# --- 1. Offline Fixtures ---
+def synthetic_provider(universe, latency=0.0):
+    # Same contract as price_store.yahoo_provider; 'latency' seconds per call mimics the network
+    def provider(tickers, start, end):
+        time.sleep(latency)
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        return {t: universe[t].loc[start:end] for t in tickers if t in universe}
+    return provider
+
+
+def seed_signal_store(universe, seed=0):
+    # Events for compare_strategies, latest scans for validate_csv_list
+    df_signals = make_signals(universe, len(universe) * SIGNALS_PER_TICKER, seed=seed)
+    df_signals['Scan_Date'] = df_signals['Scan_Date'].dt.strftime('%Y-%m-%d')
+    upsert_signals(df_signals, EVENTS_SOURCE)
+    upsert_signals(df_signals, OVERSOLD_SOURCE)
+    return df_signals
+
+
+# --- 2. One Benchmark Size ---
+def bench_firestore_write(df_signals, profiler):
+    # The Pattern_Scanner write path with the dry-run backend (no cloud project needed)
+    with profiler.stage('firestore write (dry run)'), \
+            open_sink('pattern_signals', dry_run_file='firestore_dry_run.jsonl') as sink:
+        doc_ids = df_signals['Ticker'] + '_' + df_signals['Scan_Date']
+        sink.add_frame(df_signals.assign(RSI='-'), doc_ids, Pattern_Type='Hammer',
+                       Created_At=datetime.now(timezone.utc))
+    for i, seconds in enumerate(sink.commit_times):
+        profiler.add_ticker('firestore batch', f"batch {i + 1}", seconds)
+
+
+def run_pass(universe, max_workers, latency, make_plots, track_memory, keep, seed=0):
+    # One full run in a fresh scratch folder: every relative path the scripts use
+    # (signals.db, price_cache/, plots/, CSVs) lands there, and downloads always start cold
+    home = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix=f"bench_{len(universe)}_")
+    os.chdir(workdir)
+    try:
+        provider = synthetic_provider(universe, latency)
+        df_signals = seed_signal_store(universe, seed)
+        profiles = {name: Profiler(track_memory=track_memory)
+                    for name in ('run_full_deduped_fixed', 'validate_csv_list', 'firestore sink')}
+
+        # The scripts print a lot; keep it out of the benchmark tables
+        with open('pipeline_output.log', 'w') as log, redirect_stdout(log):
+            run_full_deduped_fixed(profiler=profiles['run_full_deduped_fixed'], sync=False, provider=provider)
+            validate_csv_list(max_workers=max_workers, timeout=0, make_plots=make_plots,
+                              profiler=profiles['validate_csv_list'], provider=provider)
+            bench_firestore_write(df_signals, profiles['firestore sink'])
+    finally:
+        os.chdir(home)
+        if track_memory:
+            stop_tracing()  # the next timing pass must not run under tracemalloc
+        if keep:
+            print(f"Kept scratch folder: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return profiles
+
+
+def bench_size(n_tickers, max_workers, latency, make_plots, measure_memory, keep, seed=0):
+    # Yesterday as the last bar, so the price store treats every bar as final
+    end = (datetime.today() - timedelta(days=1)).strftime('%Y-%m-%d')
+    universe = make_universe(n_tickers, n_bars=N_BARS, seed=seed, end=end)
+
+    # Timings come from a pass without tracemalloc (it slows every allocation),
+    # peak memory from a second, separate pass
+    timing = run_pass(universe, max_workers, latency, make_plots, False, keep, seed)
+    memory = run_pass(universe, max_workers, latency, make_plots, True, keep, seed) if measure_memory else {}
+
+    stages, latency_rows = [], []
+    for pipeline, profiler in timing.items():
+        meta = {'Tickers': n_tickers, 'Pipeline': pipeline}
+        table = profiler.stage_table()
+        if pipeline in memory:
+            peaks = memory[pipeline].stage_table().set_index('Stage')['Peak MB']
+            table['Peak MB'] = table['Stage'].map(peaks)
+        stages.append(table.assign(**meta))
+        if profiler.tickers:
+            latency_rows.append(profiler.ticker_table().assign(**meta))
+
+    return pd.concat(stages), pd.concat(latency_rows), timing['firestore sink'].peak_rss_mb()
+
+
+# --- 3. The Benchmark ---
+def run_benchmark(sizes, max_workers=MAX_WORKERS, latency=0.0, plot_up_to=PLOT_UP_TO, measure_memory=True,
+                  keep=False):
+    print("--- ⏱️ PIPELINE BENCHMARK (synthetic OHLCV, offline) ⏱️ ---")
+    all_stages, all_latency = [], []
+
+    for n_tickers in sizes:
+        start = time.perf_counter()
+        stages, latency_rows, peak_rss = bench_size(n_tickers, max_workers, latency, n_tickers <= plot_up_to,
+                                                    measure_memory, keep)
+        print(f"Finished {n_tickers} tickers in {time.perf_counter() - start:.1f}s "
+              f"(peak RSS so far {peak_rss} MB)")
+        all_stages.append(stages)
+        all_latency.append(latency_rows)
+
+    df_stages = pd.concat(all_stages, ignore_index=True)
+    df_latency = pd.concat(all_latency, ignore_index=True)
+    front = ['Tickers', 'Pipeline']
+    df_stages = df_stages[front + [c for c in df_stages.columns if c not in front]]
+    df_latency = df_latency[front + [c for c in df_latency.columns if c not in front]]
+
+    print("\n" + "=" * 80)
+    print("PER-STAGE TIMING ('Work' = summed per-ticker time, across all pool workers)")
+    print("=" * 80)
+    print(df_stages.to_string(index=False))
+    print("\n--- Per-ticker latency ---")
+    print(df_latency.to_string(index=False))
+
+    df_stages.to_csv(STAGES_FILE, index=False)
+    df_latency.to_csv(LATENCY_FILE, index=False)
+    print(f"\nSaved {STAGES_FILE} and {LATENCY_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every stage of the comparison and validation pipelines offline.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=TICKER_SIZES, help="Universe sizes (tickers)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated seconds per price download call")
+    parser.add_argument('--plot-up-to', type=int, default=PLOT_UP_TO,
+                        help="Run the bt.plot stage only for universes up to this many tickers")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the separate tracemalloc pass (halves the run time, no 'Peak MB')")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch folders for inspection")
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, args.workers, args.latency, args.plot_up_to, not args.no_memory, args.keep)
@@ -0,0 +1,76 @@
+import pandas as pd
+import pandas_ta_classic as ta
+import argparse
+import time
+
+from synthetic_data import make_universe, make_signals
+from trade_engine import simulate_signals
+from compare_strategies import simulate_signals_loop
+
+# --- CONFIGURATION ---
+SIGNAL_SIZES = [1_000, 50_000]
+SIGNALS_PER_TICKER = 10
+
+
+def build_market_data(n_tickers, seed=0):
+    market_data = make_universe(n_tickers, seed=seed)
+    for df in market_data.values():
+        df['RSI'] = ta.rsi(df['Close'], length=14)
+        df['SMA_200'] = ta.sma(df['Close'], length=200)
+    return market_data
+
+
+def check_identical(loop_result, fast_result):
+    loop_strats, loop_inspect = loop_result
+    fast_strats, fast_inspect = fast_result
+
+    for name in loop_strats:
+        if [t['Return'] for t in loop_strats[name]] != [t['Return'] for t in fast_strats[name]]:
+            raise AssertionError(f"Trades differ for strategy '{name}'")
+
+    if not pd.DataFrame(loop_inspect).equals(pd.DataFrame(fast_inspect)):
+        raise AssertionError("Inspection lists differ")
+
+
+def run_benchmark(sizes, skip_loop_above):
+    print("--- ⏱️ TRADE ENGINE BENCHMARK ⏱️ ---")
+    rows = []
+
+    for n_signals in sizes:
+        n_tickers = max(n_signals // SIGNALS_PER_TICKER, 1)
+        market_data = build_market_data(n_tickers)
+        df_signals = make_signals(market_data, n_signals)
+
+        start = time.perf_counter()
+        fast_result = simulate_signals(df_signals, market_data)
+        fast_time = time.perf_counter() - start
+
+        loop_time = None
+        if n_signals <= skip_loop_above:
+            start = time.perf_counter()
+            loop_result = simulate_signals_loop(df_signals, market_data)
+            loop_time = time.perf_counter() - start
+            check_identical(loop_result, fast_result)
+
+        n_trades = sum(len(v) for v in fast_result[0].values())
+        rows.append({
+            'Signals': n_signals,
+            'Tickers': n_tickers,
+            'Trades': n_trades,
+            'Loop (s)': round(loop_time, 3) if loop_time is not None else None,
+            'Vectorized (s)': round(fast_time, 3),
+            'Speedup': f"{loop_time / fast_time:.1f}x" if loop_time is not None else '-',
+            'Identical': 'yes' if loop_time is not None else 'not checked'
+        })
+        print(f"Finished {n_signals} signals.")
+
+    print("\n" + pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the per-row loop with the vectorized trade engine.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIGNAL_SIZES)
+    parser.add_argument('--skip-loop-above', type=int, default=10 ** 9,
+                        help="Only time the vectorized engine for larger signal counts")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, args.skip_loop_above)
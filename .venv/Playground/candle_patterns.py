@@ -0,0 +1,200 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Two encodings of the same rules:
+# - codes: one int8 per bar; when several rules match, the earliest code in this list wins,
+#   which keeps the Doji / Hammer / Engulfing labels identical to compare_strategies.detect_pattern
+#   (trade_engine needs that parity).
+# - flags: one bit per pattern, set independently, like Finviz returning a ticker under every
+#   Candlestick filter it matches (Pattern_Scanner --local needs that).
+NO_PATTERN, STANDARD_DOJI, DRAGONFLY_DOJI, GRAVESTONE_DOJI, HAMMER, ENGULFING, \
+    MARUBOZU_WHITE, LONG_LOWER_SHADOW = range(8)
+
+PATTERN_NAMES = {
+    STANDARD_DOJI: 'Standard Doji',
+    DRAGONFLY_DOJI: 'Dragonfly Doji',
+    GRAVESTONE_DOJI: 'Gravestone Doji',
+    HAMMER: 'Hammer',
+    ENGULFING: 'Engulfing',
+    MARUBOZU_WHITE: 'Marubozu White',
+    LONG_LOWER_SHADOW: 'Long Lower Shadow',
+}
+PATTERN_CODES = {name: code for code, name in PATTERN_NAMES.items()}
+DOJI_CODES = (STANDARD_DOJI, DRAGONFLY_DOJI, GRAVESTONE_DOJI)
+PATTERN_FLAGS = {name: 1 << (code - 1) for code, name in PATTERN_NAMES.items()}  # fits in uint8
+
+# Thresholds for the Finviz-style patterns (fractions of the bar's High-Low range)
+MARUBOZU_BODY = 0.9
+LONG_SHADOW = 0.6
+
+
+# --- 1. NumPy Path ---
+def _detect_numpy(o, h, l, c):
+    prev_o = np.r_[np.nan, o[:-1]]
+    prev_c = np.r_[np.nan, c[:-1]]
+
+    body = np.abs(c - o)
+    rng = h - l
+    upper_shadow = h - np.maximum(o, c)
+    lower_shadow = np.minimum(o, c) - l
+
+    is_doji = body <= (0.1 * rng)
+    is_hammer = (body <= 0.3 * rng) & (lower_shadow >= 2 * body) & (upper_shadow <= body)
+    is_engulfing = (prev_c < prev_o) & (c > o) & (o <= prev_c) & (c >= prev_o)
+    is_marubozu = (c > o) & (body >= MARUBOZU_BODY * rng)
+    is_long_lower = lower_shadow >= LONG_SHADOW * rng
+
+    codes = np.select(
+        [is_doji & (upper_shadow <= 0.3 * rng),
+         is_doji & (lower_shadow <= 0.3 * rng),
+         is_doji,
+         is_hammer,
+         is_engulfing,
+         is_marubozu,
+         is_long_lower],
+        [DRAGONFLY_DOJI, GRAVESTONE_DOJI, STANDARD_DOJI, HAMMER, ENGULFING,
+         MARUBOZU_WHITE, LONG_LOWER_SHADOW],
+        default=NO_PATTERN
+    ).astype(np.int8)
+
+    codes[np.isnan(o) | np.isnan(prev_o) | (rng == 0)] = NO_PATTERN
+    return codes
+
+
+# --- 2. Optional JIT Path (same rules, one pass, no temporaries) ---
+def _detect_loop(o, h, l, c):
+    n = len(o)
+    codes = np.zeros(n, dtype=np.int8)
+    for i in range(1, n):
+        if np.isnan(o[i]) or np.isnan(o[i - 1]):
+            continue
+        rng = h[i] - l[i]
+        if rng == 0:
+            continue
+
+        body = abs(c[i] - o[i])
+        upper_shadow = h[i] - max(o[i], c[i])
+        lower_shadow = min(o[i], c[i]) - l[i]
+
+        if body <= 0.1 * rng:
+            if upper_shadow <= 0.3 * rng:
+                codes[i] = DRAGONFLY_DOJI
+            elif lower_shadow <= 0.3 * rng:
+                codes[i] = GRAVESTONE_DOJI
+            else:
+                codes[i] = STANDARD_DOJI
+        elif body <= 0.3 * rng and lower_shadow >= 2 * body and upper_shadow <= body:
+            codes[i] = HAMMER
+        elif c[i - 1] < o[i - 1] and c[i] > o[i] and o[i] <= c[i - 1] and c[i] >= o[i - 1]:
+            codes[i] = ENGULFING
+        elif c[i] > o[i] and body >= MARUBOZU_BODY * rng:
+            codes[i] = MARUBOZU_WHITE
+        elif lower_shadow >= LONG_SHADOW * rng:
+            codes[i] = LONG_LOWER_SHADOW
+    return codes
+
+
+_detect_jit = njit(cache=True)(_detect_loop) if njit else None
+
+
+# --- 3. Finviz-Style Flags (independent bits, same thresholds) ---
+# The three Doji kinds stay exclusive among themselves; every other pattern is tested on its own.
+def _flags_numpy(o, h, l, c):
+    prev_o = np.r_[np.nan, o[:-1]]
+    prev_c = np.r_[np.nan, c[:-1]]
+
+    body = np.abs(c - o)
+    rng = h - l
+    upper_shadow = h - np.maximum(o, c)
+    lower_shadow = np.minimum(o, c) - l
+
+    is_doji = body <= (0.1 * rng)
+    is_dragonfly = is_doji & (upper_shadow <= 0.3 * rng)
+    is_gravestone = is_doji & ~is_dragonfly & (lower_shadow <= 0.3 * rng)
+    rules = {
+        STANDARD_DOJI: is_doji & ~is_dragonfly & ~is_gravestone,
+        DRAGONFLY_DOJI: is_dragonfly,
+        GRAVESTONE_DOJI: is_gravestone,
+        HAMMER: (body <= 0.3 * rng) & (lower_shadow >= 2 * body) & (upper_shadow <= body),
+        ENGULFING: (prev_c < prev_o) & (c > o) & (o <= prev_c) & (c >= prev_o),
+        MARUBOZU_WHITE: (c > o) & (body >= MARUBOZU_BODY * rng),
+        LONG_LOWER_SHADOW: lower_shadow >= LONG_SHADOW * rng,
+    }
+
+    flags = np.zeros(len(o), dtype=np.uint8)
+    for code, mask in rules.items():
+        flags |= mask.astype(np.uint8) << np.uint8(code - 1)
+
+    flags[np.isnan(o) | np.isnan(prev_o) | (rng == 0)] = 0
+    return flags
+
+
+def _flags_loop(o, h, l, c):
+    n = len(o)
+    flags = np.zeros(n, dtype=np.uint8)
+    for i in range(1, n):
+        if np.isnan(o[i]) or np.isnan(o[i - 1]):
+            continue
+        rng = h[i] - l[i]
+        if rng == 0:
+            continue
+
+        body = abs(c[i] - o[i])
+        upper_shadow = h[i] - max(o[i], c[i])
+        lower_shadow = min(o[i], c[i]) - l[i]
+        bits = 0
+
+        if body <= 0.1 * rng:
+            if upper_shadow <= 0.3 * rng:
+                bits |= 1 << (DRAGONFLY_DOJI - 1)
+            elif lower_shadow <= 0.3 * rng:
+                bits |= 1 << (GRAVESTONE_DOJI - 1)
+            else:
+                bits |= 1 << (STANDARD_DOJI - 1)
+        if body <= 0.3 * rng and lower_shadow >= 2 * body and upper_shadow <= body:
+            bits |= 1 << (HAMMER - 1)
+        if c[i - 1] < o[i - 1] and c[i] > o[i] and o[i] <= c[i - 1] and c[i] >= o[i - 1]:
+            bits |= 1 << (ENGULFING - 1)
+        if c[i] > o[i] and body >= MARUBOZU_BODY * rng:
+            bits |= 1 << (MARUBOZU_WHITE - 1)
+        if lower_shadow >= LONG_SHADOW * rng:
+            bits |= 1 << (LONG_LOWER_SHADOW - 1)
+        flags[i] = bits
+    return flags
+
+
+_flags_jit = njit(cache=True)(_flags_loop) if njit else None
+
+
+# --- 4. Public API ---
+def detect_patterns(o, h, l, c, use_jit=False):
+    # Labels every bar of an OHLC series in one pass. Bar i is compared with bar i - 1,
+    # so bar 0 never has a pattern. use_jit needs numba and falls back to NumPy without it.
+    o, h, l, c = (np.asarray(x, dtype=np.float64) for x in (o, h, l, c))
+    if use_jit and _detect_jit is not None:
+        return _detect_jit(o, h, l, c)
+    return _detect_numpy(o, h, l, c)
+
+
+def detect_frame(df, use_jit=False):
+    return detect_patterns(df['Open'], df['High'], df['Low'], df['Close'], use_jit=use_jit)
+
+
+def pattern_name(code):
+    return PATTERN_NAMES.get(int(code))
+
+
+def detect_flags(o, h, l, c, use_jit=False):
+    # Bitmask per bar: test a pattern with (flags & PATTERN_FLAGS[name]) != 0
+    o, h, l, c = (np.asarray(x, dtype=np.float64) for x in (o, h, l, c))
+    if use_jit and _flags_jit is not None:
+        return _flags_jit(o, h, l, c)
+    return _flags_numpy(o, h, l, c)
+
+
+def detect_frame_flags(df, use_jit=False):
+    return detect_flags(df['Open'], df['High'], df['Low'], df['Close'], use_jit=use_jit)
@@ -0,0 +1,155 @@
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import json
+import threading
+import time
+
+# --- CONFIGURATION ---
+BATCH_SIZE = 400  # Firestore allows 500 writes per batch; stay under it
+MAX_IN_FLIGHT = 4  # batches committing at the same time
+DRY_RUN_FILE = 'firestore_dry_run.jsonl'
+
+
+# --- 1. Cleaning (whole frame at once) ---
+def clean_frame(df, numeric_columns=('RSI',), **constants):
+    # Coerces 'numeric_columns' in one pass ('-' and other junk become None, like the old
+    # per-row float() try/except) and stamps every record with 'constants'.
+    df = df.copy()
+    for col in numeric_columns:
+        if col in df.columns:
+            values = pd.to_numeric(df[col], errors='coerce')
+            df[col] = values.astype(object).where(values.notna(), None)
+        else:
+            df[col] = None
+
+    records = df.to_dict(orient='records')
+    if constants:
+        records = [{**r, **constants} for r in records]
+    return records
+
+
+# --- 2. Backends ---
+# A backend takes one list of (doc_id, data) and writes it as a unit.
+# It may be called from several threads at once.
+class FirestoreBackend:
+    # 'db' is anything shaped like a firestore.Client (batch().set(ref, data) / commit())
+    def __init__(self, db, collection):
+        self.db = db
+        self.collection = collection
+
+    def write(self, docs):
+        batch = self.db.batch()
+        for doc_id, data in docs:
+            batch.set(self.db.collection(self.collection).document(doc_id), data)
+        batch.commit()
+
+
+class LocalFileBackend:
+    # Dry run: appends one JSON line per document instead of touching the cloud project
+    def __init__(self, path=DRY_RUN_FILE, collection=None):
+        self.path = path
+        self.collection = collection
+        self.lock = threading.Lock()
+
+    def write(self, docs):
+        lines = [json.dumps({'collection': self.collection, 'id': doc_id, 'data': data}, default=str)
+                 for doc_id, data in docs]
+        with self.lock, open(self.path, 'a') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+# --- 3. The Sink ---
+class FirestoreSink:
+    # Buffers documents, commits full batches on a thread pool with at most
+    # 'max_in_flight' commits pending, and flushes whatever is left on exit,
+    # including when the caller raised. Failed batches are reported, not retried.
+    def __init__(self, backend, batch_size=BATCH_SIZE, max_in_flight=MAX_IN_FLIGHT):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.pool = ThreadPoolExecutor(max_workers=max_in_flight)
+        self.pending = []
+        self.in_flight = set()
+        self.written = 0
+        self.failed = 0
+        self.errors = []
+        self.commit_times = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def add(self, doc_id, data):
+        self.pending.append((doc_id, data))
+        if len(self.pending) >= self.batch_size:
+            self._submit()
+
+    def add_frame(self, df, doc_ids, numeric_columns=('RSI',), **constants):
+        for doc_id, data in zip(doc_ids, clean_frame(df, numeric_columns, **constants)):
+            self.add(doc_id, data)
+
+    def _commit(self, docs):
+        start = time.perf_counter()
+        self.backend.write(docs)
+        return len(docs), time.perf_counter() - start
+
+    def _collect(self, done):
+        for future in done:
+            self.in_flight.discard(future)
+            size, error = future.docs_count, future.exception()
+            if error:
+                self.failed += size
+                self.errors.append(f"{type(error).__name__}: {error}")
+            else:
+                _, seconds = future.result()
+                self.written += size
+                self.commit_times.append(seconds)
+
+    def _submit(self):
+        docs, self.pending = self.pending, []
+        if not docs:
+            return
+        # Back-pressure: wait for a slot instead of queueing unbounded batches in memory
+        while len(self.in_flight) >= self.max_in_flight:
+            done, _ = wait(self.in_flight, return_when=FIRST_COMPLETED)
+            self._collect(done)
+        future = self.pool.submit(self._commit, docs)
+        future.docs_count = len(docs)
+        self.in_flight.add(future)
+
+    def flush(self):
+        self._submit()
+        if self.in_flight:
+            done, _ = wait(self.in_flight)
+            self._collect(done)
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.pool.shutdown(wait=True)
+        for error in self.errors:
+            print(f"Failed batch commit: {error}")
+        return self.written
+
+    def stats(self):
+        times = pd.Series(self.commit_times, dtype=float)
+        return {
+            'Written': self.written,
+            'Failed': self.failed,
+            'Batches': len(self.commit_times),
+            'Commit p50 (s)': round(float(times.median()), 4) if len(times) else None,
+            'Commit max (s)': round(float(times.max()), 4) if len(times) else None
+        }
+
+
+def open_sink(collection, db=None, dry_run_file=None, batch_size=BATCH_SIZE, max_in_flight=MAX_IN_FLIGHT):
+    # dry_run_file wins over db, so a dry run never needs credentials
+    if dry_run_file:
+        backend = LocalFileBackend(dry_run_file, collection)
+    else:
+        backend = FirestoreBackend(db, collection)
+    return FirestoreSink(backend, batch_size, max_in_flight)
@@ -0,0 +1,200 @@
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+import argparse
+import pickle
+import os
+
+from price_store import get_history
+from signal_store import latest_scan_dates, OVERSOLD_SOURCE
+
+# --- CONFIGURATION ---
+STATE_FILE = 'indicator_state.pkl'
+SNAPSHOT_FILE = 'indicator_snapshot.csv'
+RSI_LENGTH = 14
+SMA_LENGTH = 200
+BOOTSTRAP_DAYS = 365 + 300  # first run per ticker streams this much history to seed the state
+
+
+# --- 1. Streaming Indicators (one bar in, O(1) work) ---
+# State is a plain dict of floats and lists, pickled as one file for the whole universe.
+# Wilder RSI follows pandas_ta: the first average is the SMA of the first 'length' moves,
+# then avg = avg + (move - avg) / length.
+def new_state(rsi_length=RSI_LENGTH, sma_length=SMA_LENGTH):
+    return {
+        'rsi_length': rsi_length,
+        'sma_length': sma_length,
+        'last_date': None,
+        'last_close': None,
+        'n_moves': 0,
+        'avg_gain': 0.0,
+        'avg_loss': 0.0,
+        'window': [],
+        'window_pos': 0,
+        'window_sum': 0.0,
+        'rsi': None,
+        'sma': None,
+        'previous': None  # undo record for the last bar, so a revised bar can be re-applied
+    }
+
+
+# Everything except the window itself; the undo record keeps these plus the one overwritten slot
+SCALAR_FIELDS = ('last_date', 'last_close', 'n_moves', 'avg_gain', 'avg_loss',
+                 'window_pos', 'window_sum', 'rsi', 'sma')
+
+
+def _undo_record(state):
+    # O(1): a full ring buffer overwrites exactly one slot, a filling one only appends
+    window = state['window']
+    full = len(window) == state['sma_length']
+    record = {k: state[k] for k in SCALAR_FIELDS}
+    record['overwritten'] = window[state['window_pos']] if full else None
+    return record
+
+
+def _undo_last_bar(state):
+    record = state['previous']
+    if record['overwritten'] is None:
+        state['window'].pop()
+    else:
+        state['window'][record['window_pos']] = record['overwritten']
+    for k in SCALAR_FIELDS:
+        state[k] = record[k]
+    state['previous'] = None
+
+
+def _apply_bar(state, date, close):
+    n = state['rsi_length']
+
+    if state['last_close'] is not None:
+        move = close - state['last_close']
+        gain, loss = max(move, 0.0), max(-move, 0.0)
+        state['n_moves'] += 1
+
+        if state['n_moves'] <= n:
+            # Seeding: accumulate, then switch to the simple average
+            state['avg_gain'] += gain
+            state['avg_loss'] += loss
+            if state['n_moves'] == n:
+                state['avg_gain'] /= n
+                state['avg_loss'] /= n
+        else:
+            state['avg_gain'] += (gain - state['avg_gain']) / n
+            state['avg_loss'] += (loss - state['avg_loss']) / n
+
+        if state['n_moves'] >= n:
+            total = state['avg_gain'] + state['avg_loss']
+            state['rsi'] = 100 * state['avg_gain'] / total if total > 0 else None
+
+    # Ring buffer of the last 'sma_length' closes with a running sum
+    window = state['window']
+    if len(window) < state['sma_length']:
+        window.append(close)
+    else:
+        state['window_sum'] -= window[state['window_pos']]
+        window[state['window_pos']] = close
+        state['window_pos'] = (state['window_pos'] + 1) % state['sma_length']
+    state['window_sum'] += close
+    if len(window) == state['sma_length']:
+        state['sma'] = state['window_sum'] / state['sma_length']
+
+    state['last_close'] = close
+    state['last_date'] = date
+
+
+def update_state(state, date, close, keep_previous=True):
+    # Feeds one daily bar. Bars older than the last one seen are ignored;
+    # a new value for the last date (e.g. yesterday's partial bar) replaces it.
+    date = pd.Timestamp(date).strftime('%Y-%m-%d')
+    if close is None or np.isnan(close):
+        return state
+    close = float(close)
+
+    if state['last_date'] is not None:
+        if date < state['last_date']:
+            return state
+        if date == state['last_date']:
+            if state['previous'] is None:
+                return state
+            _undo_last_bar(state)
+
+    previous = _undo_record(state) if keep_previous else None
+    _apply_bar(state, date, close)
+    state['previous'] = previous
+    return state
+
+
+def update_from_history(state, df):
+    # Applies every bar in 'df' that is newer than (or revises) the stored state
+    if state['last_date'] is not None:
+        df = df.loc[pd.Timestamp(state['last_date']):]
+    # Only the newest bar needs an undo copy
+    last = len(df) - 1
+    for i, (date, close) in enumerate(zip(df.index, df['Close'].to_numpy(dtype=float))):
+        update_state(state, date, close, keep_previous=(i == last))
+    return state
+
+
+# --- 2. Persistence ---
+def load_states(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def save_states(states, path=STATE_FILE):
+    # Write to a temp file first so a crash never leaves a half-written state file
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(states, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+# --- 3. Nightly Refresh ---
+def refresh_indicators(tickers, path=STATE_FILE, provider=None):
+    # Updates RSI / SMA for every ticker using only the bars added since the last run
+    states = load_states(path)
+    today = datetime.today()
+
+    # Known tickers only need the tail; new ones are bootstrapped from full history
+    known = [t for t in tickers if t in states and states[t]['last_date']]
+    new = [t for t in tickers if t not in known]
+
+    if known:
+        oldest = min(states[t]['last_date'] for t in known)
+        history = get_history(known, start=oldest, provider=provider)
+        for ticker in known:
+            if ticker in history:
+                update_from_history(states[ticker], history[ticker])
+
+    if new:
+        history = get_history(new, start=today - timedelta(days=BOOTSTRAP_DAYS), provider=provider)
+        for ticker, df in history.items():
+            states[ticker] = update_from_history(new_state(), df)
+
+    save_states(states, path)
+
+    wanted = set(tickers)
+    snapshot = pd.DataFrame([
+        {'Ticker': t, 'Date': s['last_date'], 'Close': s['last_close'], 'RSI': s['rsi'], 'SMA_200': s['sma']}
+        for t, s in states.items() if t in wanted
+    ])
+    return snapshot
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update stored RSI / SMA state with the newest bars.")
+    parser.add_argument('--tickers-from', default=None,
+                        help="CSV with a 'Ticker' column (default: every ticker in the signal store)")
+    args = parser.parse_args()
+
+    if args.tickers_from:
+        tickers = list(pd.read_csv(args.tickers_from)['Ticker'].unique())
+    else:
+        tickers = list(latest_scan_dates(OVERSOLD_SOURCE))
+    print(f"--- Refreshing indicators for {len(tickers)} tickers ---")
+    snapshot = refresh_indicators(tickers)
+    snapshot.to_csv(SNAPSHOT_FILE, index=False)
+    print(snapshot.to_string(index=False))
+    print(f"\nSaved {SNAPSHOT_FILE}")
@@ -0,0 +1,194 @@
+import pandas as pd
+import numpy as np
+import pandas_ta_classic as ta
+from backtesting import Backtest
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import argparse
+import itertools
+import os
+import warnings
+
+from Backtest_Oversold_History import OversoldBounce
+from price_store import get_history
+from signal_store import latest_scan_dates, OVERSOLD_SOURCE, DB_FILE
+
+# --- CONFIGURATION ---
+PARAM_GRID = {
+    'rsi_period': [7, 14, 21],
+    'rsi_limit': [25, 30, 35],
+    'exit_rsi': [50, 60, 70],
+    'sma_filter': [100, 200]
+}
+WALK_FORWARD_SPLITS = 3  # anchored: train on chunks 0..k-1, test on chunk k
+MIN_TRADES = 20  # parameter sets with fewer trades are never picked as "best"
+MAX_WORKERS = os.cpu_count()
+RESULTS_FILE = 'parameter_sweep_results.csv'
+WALK_FORWARD_FILE = 'parameter_sweep_walk_forward.csv'
+
+
+# --- 1. Parameter Sets ---
+def build_param_sets(grid=PARAM_GRID, n_random=None, seed=0):
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+    # Exiting below the entry threshold is not a strategy
+    combos = [c for c in combos if c['exit_rsi'] > c['rsi_limit']]
+
+    if n_random and n_random < len(combos):
+        rng = np.random.default_rng(seed)
+        combos = [combos[i] for i in sorted(rng.choice(len(combos), n_random, replace=False))]
+    return combos
+
+
+def walk_forward_segments(n_bars, warmup, splits=WALK_FORWARD_SPLITS):
+    # Returns {segment_name: (start, stop)} bar ranges.
+    # Indicators are precomputed on the full history, so each slice starts fully warmed up.
+    segments = {'full': (0, n_bars)}
+    edges = np.linspace(warmup, n_bars, splits + 2).astype(int)
+    for k in range(1, splits + 1):
+        segments[f"fold{k}_train"] = (edges[0], edges[k])
+        segments[f"fold{k}_test"] = (edges[k], edges[k + 1])
+    return segments
+
+
+# --- 2. Per-Ticker Work (runs inside the process pool) ---
+# Expected on almost every segment (a position still open at its last bar) and repeated for every
+# parameter set; every other warning, e.g. about bad price data, is still shown
+warnings.filterwarnings('ignore', message='Some trades remain open at the end of backtest', category=UserWarning)
+
+
+def add_indicators(data, grid=PARAM_GRID):
+    # Each RSI / SMA length is computed exactly once per ticker and shared by every parameter set
+    data = data.copy()
+    for length in grid['rsi_period']:
+        data[f"RSI_{length}"] = ta.rsi(data['Close'], length=length)
+    for length in grid['sma_filter']:
+        data[f"SMA_{length}"] = ta.sma(data['Close'], length=length)
+    return data
+
+
+def sweep_ticker(ticker, data, param_sets, grid=PARAM_GRID, splits=WALK_FORWARD_SPLITS):
+    # Returns one row per (parameter set, segment) with the raw sums needed for aggregation
+    data = add_indicators(data, grid)
+    segments = walk_forward_segments(len(data), max(grid['sma_filter']), splits)
+
+    rows = []
+    for name, (start, stop) in segments.items():
+        bt = Backtest(data.iloc[start:stop], OversoldBounce, cash=10000, commission=.002)
+        for params in param_sets:
+            stats = bt.run(**params)
+            returns = stats['_trades']['ReturnPct'].to_numpy() * 100
+
+            rows.append({
+                **params,
+                'Segment': name,
+                'Ticker': ticker,
+                'Trades': len(returns),
+                'Wins': int((returns > 0).sum()),
+                'Gross Profit': returns[returns > 0].sum(),
+                'Gross Loss': -returns[returns < 0].sum()
+            })
+    return rows
+
+
+# --- 3. Aggregation ---
+def aggregate(df_rows):
+    # Sums trades across the whole universe, then derives the ranked metrics
+    keys = list(PARAM_GRID) + ['Segment']
+    agg = df_rows.groupby(keys, as_index=False)[['Trades', 'Wins', 'Gross Profit', 'Gross Loss']].sum()
+
+    agg['Profit Factor'] = np.where(agg['Gross Loss'] > 0,
+                                    agg['Gross Profit'] / agg['Gross Loss'].where(agg['Gross Loss'] > 0), 99.99)
+    agg['Profit Factor'] = agg['Profit Factor'].where(agg['Trades'] > 0, 0.0).round(2)
+    agg['Win Rate (%)'] = (100 * agg['Wins'] / agg['Trades'].where(agg['Trades'] > 0)).round(1)
+    return agg
+
+
+def rank(agg, segment='full', min_trades=MIN_TRADES):
+    table = agg[(agg['Segment'] == segment) & (agg['Trades'] >= min_trades)]
+    return table.sort_values(by=['Profit Factor', 'Trades'], ascending=False)
+
+
+def walk_forward_report(agg, splits=WALK_FORWARD_SPLITS, min_trades=MIN_TRADES):
+    # Pick the best parameters on each training window, then score them on the unseen test chunk
+    params = list(PARAM_GRID)
+    report = []
+    for k in range(1, splits + 1):
+        train = rank(agg, f"fold{k}_train", min_trades)
+        if train.empty:
+            continue
+        best = train.iloc[0]
+
+        test = agg[agg['Segment'] == f"fold{k}_test"]
+        for p in params:
+            test = test[test[p] == best[p]]
+        test = test.iloc[0]
+
+        report.append({
+            'Fold': k,
+            **{p: best[p] for p in params},
+            'Train PF': best['Profit Factor'],
+            'Train Trades': best['Trades'],
+            'Test PF': test['Profit Factor'],
+            'Test Win Rate (%)': test['Win Rate (%)'],
+            'Test Trades': test['Trades']
+        })
+    return pd.DataFrame(report)
+
+
+# --- 4. The Sweep ---
+def run_sweep(n_random=None, max_workers=MAX_WORKERS, splits=WALK_FORWARD_SPLITS, min_trades=MIN_TRADES):
+    unique_tickers = list(latest_scan_dates(OVERSOLD_SOURCE))
+    if not unique_tickers:
+        print(f"Error: no signals in '{DB_FILE}'. Run the daily scanner first.")
+        return
+    param_sets = build_param_sets(n_random=n_random)
+    print(f"--- 🔬 PARAMETER SWEEP: {len(param_sets)} parameter sets x {len(unique_tickers)} tickers 🔬 ---")
+
+    price_history = get_history(unique_tickers, start=datetime.today() - timedelta(days=3 * 365))
+    jobs = {t: df for t, df in price_history.items() if len(df) >= 250}
+
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(sweep_ticker, t, df, param_sets, PARAM_GRID, splits): t for t, df in jobs.items()}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                rows.extend(future.result())
+                print(f"Swept {ticker}")
+            except Exception as e:
+                print(f"Failed to sweep {ticker}: {e}")
+
+    if not rows:
+        print("No valid results generated.")
+        return
+
+    agg = aggregate(pd.DataFrame(rows))
+    columns = list(PARAM_GRID) + ['Profit Factor', 'Win Rate (%)', 'Trades']
+
+    ranked = rank(agg, 'full', min_trades)[columns]
+    print("\n" + "=" * 80)
+    print(f"PARAMETER LEADERBOARD (full window, >= {min_trades} trades)")
+    print("=" * 80)
+    print(ranked.head(20).to_string(index=False))
+    ranked.to_csv(RESULTS_FILE, index=False)
+
+    wf = walk_forward_report(agg, splits, min_trades)
+    if not wf.empty:
+        print("\n--- WALK-FORWARD (best on train, scored on next unseen chunk) ---")
+        print(wf.to_string(index=False))
+        wf.to_csv(WALK_FORWARD_FILE, index=False)
+
+    print(f"\nSaved {RESULTS_FILE} and {WALK_FORWARD_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grid / random search over OversoldBounce parameters.")
+    parser.add_argument('--random', type=int, default=None, help="Sample N parameter sets instead of the full grid")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--splits', type=int, default=WALK_FORWARD_SPLITS)
+    parser.add_argument('--min-trades', type=int, default=MIN_TRADES)
+    args = parser.parse_args()
+
+    run_sweep(n_random=args.random, max_workers=args.workers, splits=args.splits, min_trades=args.min_trades)
@@ -0,0 +1,192 @@
+import pandas as pd
+import yfinance as yf
+from datetime import datetime, timedelta
+import os
+
+# --- CONFIGURATION ---
+CACHE_FOLDER = 'price_cache'
+INDEX_FILE = '_index.csv'
+MISSES_FILE = '_misses.csv'  # tickers that came back empty from a fetch
+MAX_EMPTY_FETCHES = 3  # consecutive empty fetches before a ticker is treated as delisted...
+EMPTY_RETRY_DAYS = 7  # ...and only retried once this many days have passed
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+# --- 1. Providers ---
+# A provider is any callable: provider(tickers, start, end) -> {ticker: DataFrame}
+# 'end' is inclusive. Swap in a fake one to run the store offline.
+def yahoo_provider(tickers, start, end):
+    # One bulk request for every symbol (yfinance 'end' is exclusive)
+    raw = yf.download(list(tickers), start=start, end=end + timedelta(days=1),
+                      group_by='ticker', threads=True, progress=False)
+
+    frames = {}
+    if raw is None or raw.empty:
+        return frames
+
+    for ticker in tickers:
+        if isinstance(raw.columns, pd.MultiIndex):
+            if ticker not in raw.columns.get_level_values(0):
+                continue
+            df = raw[ticker].copy()
+        else:
+            df = raw.copy()
+
+        df = df.dropna(how='all')
+        if not df.empty:
+            frames[ticker] = df
+
+    return frames
+
+
+# --- 2. On-Disk Storage (one Parquet file per ticker + a date-range index) ---
+def _ticker_path(cache_folder, ticker):
+    return os.path.join(cache_folder, f"{ticker.replace('/', '_')}.parquet")
+
+
+def _load_index(cache_folder):
+    path = os.path.join(cache_folder, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path, parse_dates=['Start', 'End'])
+    return {row.Ticker: (row.Start, row.End) for row in df.itertuples(index=False)}
+
+
+def _save_index(cache_folder, index):
+    rows = [{'Ticker': t, 'Start': s, 'End': e} for t, (s, e) in index.items()]
+    df = pd.DataFrame(rows, columns=['Ticker', 'Start', 'End'])
+    df.to_csv(os.path.join(cache_folder, INDEX_FILE), index=False)
+
+
+def _load_misses(cache_folder):
+    path = os.path.join(cache_folder, MISSES_FILE)
+    if not os.path.exists(path):
+        return {}
+    df = pd.read_csv(path, parse_dates=['Last_Try'])
+    return {row.Ticker: (row.Misses, row.Last_Try) for row in df.itertuples(index=False)}
+
+
+def _save_misses(cache_folder, misses):
+    rows = [{'Ticker': t, 'Misses': n, 'Last_Try': d} for t, (n, d) in misses.items()]
+    df = pd.DataFrame(rows, columns=['Ticker', 'Misses', 'Last_Try'])
+    df.to_csv(os.path.join(cache_folder, MISSES_FILE), index=False)
+
+
+def _load_ticker(cache_folder, ticker):
+    path = _ticker_path(cache_folder, ticker)
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path)
+
+
+def _clean(df):
+    # Flatten yfinance multi-index columns and keep a sorted, unique date index
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = [c[0] for c in df.columns]
+    df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].copy()
+    df.index = pd.to_datetime(df.index).tz_localize(None).normalize()
+    df.index.name = 'Date'
+    df = df[~df.index.duplicated(keep='last')]
+    return df.sort_index()
+
+
+# --- 3. Public API ---
+def get_history(tickers, start, end=None, provider=None, cache_folder=CACHE_FOLDER):
+    # Returns {ticker: OHLCV DataFrame} covering [start, end].
+    # Only the ranges not already on disk are requested, grouped into bulk calls.
+    provider = provider or yahoo_provider
+    start = pd.Timestamp(start).normalize()
+    today = pd.Timestamp(datetime.today()).normalize()
+    end = pd.Timestamp(end or today).normalize()
+
+    if not os.path.exists(cache_folder):
+        os.makedirs(cache_folder)
+
+    index = _load_index(cache_folder)
+    misses = _load_misses(cache_folder)
+    tickers = list(dict.fromkeys(tickers))
+
+    # A. Work out which window each ticker is missing
+    # Tickers that need the same window are fetched together in one request
+    requests = {}
+    for ticker in tickers:
+        # Likely delisted: empty several times in a row, so only retry after a while
+        n_misses, last_try = misses.get(ticker, (0, None))
+        if n_misses >= MAX_EMPTY_FETCHES and today - last_try < timedelta(days=EMPTY_RETRY_DAYS):
+            continue
+
+        # Only the parts touching the covered range are fetched, so the index stays one
+        # contiguous range: a head before it and/or a tail after it
+        covered = index.get(ticker)
+        if covered is None:
+            windows = [(start, end)]
+        else:
+            windows = []
+            if start < covered[0]:
+                windows.append((start, covered[0] - timedelta(days=1)))
+            if end > covered[1]:
+                windows.append((covered[1] + timedelta(days=1), end))
+        for window in windows:
+            requests.setdefault(window, []).append(ticker)
+
+    # B. Fetch and merge into the store (merged frames are kept to avoid re-reading them)
+    merged_frames = {}
+    for (win_start, win_end), group in requests.items():
+        print(f"Fetching {len(group)} tickers ({win_start.date()} -> {win_end.date()})...")
+        try:
+            fetched = provider(group, win_start, win_end)
+        except Exception as e:
+            print(f"Fetch failed for {len(group)} tickers: {e}")
+            continue
+
+        # Today's bar may still be forming, so it is never marked as final
+        checked_end = min(win_end, today - timedelta(days=1))
+        has_trading_days = len(pd.bdate_range(win_start, checked_end)) > 0
+
+        for ticker in group:
+            new = fetched.get(ticker)
+            old = index.get(ticker)
+            is_head = old is not None and win_end < old[0]
+
+            if new is not None and not new.empty:
+                cached = _load_ticker(cache_folder, ticker)
+                new = _clean(new)
+                merged = new if cached is None else _clean(pd.concat([cached, new]))
+                merged.to_parquet(_ticker_path(cache_folder, ticker))
+                merged_frames[ticker] = merged
+                misses.pop(ticker, None)
+            elif has_trading_days and not is_head:
+                # Bulk downloads silently drop symbols when a request fails, so an empty
+                # result is not proof there is no data: leave the index alone and retry next run
+                n_misses, _ = misses.get(ticker, (0, None))
+                misses[ticker] = (n_misses + 1, today)
+                continue
+            # Nothing to fetch over a weekend-only window either; it is safe to mark as checked.
+            # An empty head (before the first cached bar) is marked too: the ticker has data later,
+            # so this is almost always history before it listed, and would otherwise be re-asked every run.
+
+            if old is None:
+                index[ticker] = (win_start, checked_end)
+            elif is_head:
+                index[ticker] = (win_start, old[1])
+            elif win_start <= old[1] + timedelta(days=1):
+                index[ticker] = (old[0], max(old[1], checked_end))
+            else:
+                # Not contiguous with what is covered (should not happen with the windows above):
+                # keep only the newer range rather than claim the gap
+                index[ticker] = (win_start, checked_end)
+
+    _save_index(cache_folder, index)
+    _save_misses(cache_folder, misses)
+
+    # C. Serve every ticker from disk
+    history = {}
+    for ticker in tickers:
+        df = merged_frames[ticker] if ticker in merged_frames else _load_ticker(cache_folder, ticker)
+        if df is None:
+            continue
+        df = df.loc[start:end]
+        if not df.empty:
+            history[ticker] = df
+
+    return history
@@ -0,0 +1,159 @@
+import pandas as pd
+from finvizfinance.screener.overview import Overview
+from finvizfinance.screener.technical import Technical
+from datetime import datetime
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import warnings
+
+# --- CONFIGURATION ---
+CACHE_FOLDER = 'screener_cache'
+RATE_PER_SEC = 1.0  # sustained Finviz requests per second
+BURST = 2  # requests allowed back-to-back before the rate applies
+MAX_CONCURRENCY = 4
+RETRIES = 3
+BACKOFF_SEC = 2.0  # first retry wait; doubles every attempt (plus jitter)
+SCREENER_URL = None  # e.g. 'http://127.0.0.1:8000/screener.ashx' to point at a local stand-in
+PAGE_SIZE = 20  # rows per Finviz screener page
+
+VIEWS = {
+    'overview': Overview,
+    'technical': Technical
+}
+
+
+# --- 1. Rate Limiting ---
+class TokenBucket:
+    # Classic token bucket: 'rate' tokens per second, at most 'capacity' saved up
+    def __init__(self, rate=RATE_PER_SEC, capacity=BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# --- 2. Fetchers ---
+# A fetcher is any blocking callable: fetcher(view, filters_dict, page) -> DataFrame or None,
+# returning one screener page (1-based) and None past the last page.
+# It runs in a worker thread, so plain requests-based code is fine.
+# Pages are requested one at a time so every HTTP request goes through the token bucket;
+# screener_view() on its own would walk all pages with its own sleep(1).
+warnings.filterwarnings('ignore', message='Limit parameter is ignored')
+
+
+def finviz_fetch(view, filters_dict, page=1):
+    screener = VIEWS[view]()
+    if SCREENER_URL:
+        screener.url = SCREENER_URL
+    screener.set_filter(filters_dict=filters_dict)
+    return screener.screener_view(select_page=page, verbose=0)
+
+
+# --- 3. Response Cache (one file per filter set per day, non-empty results only) ---
+def _cache_path(cache_folder, name, view, filters_dict, scan_date):
+    key = hashlib.sha1(json.dumps([view, filters_dict], sort_keys=True).encode()).hexdigest()[:12]
+    safe_name = ''.join(ch if ch.isalnum() else '_' for ch in name)
+    return os.path.join(cache_folder, f"{scan_date}_{safe_name}_{key}.pkl")
+
+
+# --- 4. Concurrent Fetch ---
+async def _fetch_page(view, filters_dict, page, fetcher, bucket, semaphore, retries, backoff, record):
+    # One page, one token per attempt. Raises the last error once retries are used up.
+    for attempt in range(retries + 1):
+        await bucket.acquire()
+        async with semaphore:
+            record['Attempts'] += 1
+            start = time.perf_counter()
+            try:
+                return await asyncio.to_thread(fetcher, view, filters_dict, page)
+            except Exception as e:
+                error = e
+            finally:
+                record['Latency (s)'] = round(record['Latency (s)'] + time.perf_counter() - start, 3)
+        if attempt < retries:
+            await asyncio.sleep(backoff * (2 ** attempt) * (1 + random.random() * 0.25))
+    raise error
+
+
+async def _fetch_one(name, view, filters_dict, fetcher, bucket, semaphore, retries, backoff, cache_path):
+    record = {'Request': name, 'Pages': 0, 'Attempts': 0, 'Latency (s)': 0.0, 'Cached': False,
+              'Rows': 0, 'Error': ''}
+
+    if cache_path and os.path.exists(cache_path):
+        df = pd.read_pickle(cache_path)
+        record.update({'Cached': True, 'Rows': len(df)})
+        return df, record
+
+    frames = []
+    page = 1
+    while True:
+        try:
+            df = await _fetch_page(view, filters_dict, page, fetcher, bucket, semaphore, retries, backoff, record)
+        except Exception as e:
+            record['Error'] = f"{type(e).__name__}: {e}"
+            return None, record
+        record['Pages'] = page
+        if df is None or df.empty:
+            break
+        frames.append(df)
+        if len(df) < PAGE_SIZE:
+            break
+        page += 1
+
+    if not frames:
+        # Not cached: Finviz may simply not have updated yet, so the next run asks again
+        return None, record
+
+    df = pd.concat(frames, ignore_index=True)
+    record['Rows'] = len(df)
+    if cache_path:
+        df.to_pickle(cache_path)
+    return df, record
+
+
+async def _fetch_all(requests, fetcher, rate, burst, max_concurrency, retries, backoff, cache_folder, scan_date):
+    bucket = TokenBucket(rate, burst)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = []
+    for name, (view, filters_dict) in requests.items():
+        cache_path = _cache_path(cache_folder, name, view, filters_dict, scan_date) if cache_folder else None
+        tasks.append(_fetch_one(name, view, filters_dict, fetcher, bucket, semaphore, retries, backoff, cache_path))
+    return await asyncio.gather(*tasks)
+
+
+def fetch_screeners(requests, fetcher=None, rate=RATE_PER_SEC, burst=BURST, max_concurrency=MAX_CONCURRENCY,
+                    retries=RETRIES, backoff=BACKOFF_SEC, cache_folder=CACHE_FOLDER, scan_date=None):
+    # requests: {name: (view, filters_dict)}. Returns ({name: DataFrame or None}, latency report).
+    # A failed request maps to None and keeps its last error in the report.
+    fetcher = fetcher or finviz_fetch
+    scan_date = scan_date or datetime.today().strftime('%Y-%m-%d')
+    if cache_folder and not os.path.exists(cache_folder):
+        os.makedirs(cache_folder)
+
+    outcomes = asyncio.run(_fetch_all(requests, fetcher, rate, burst, max_concurrency,
+                                      retries, backoff, cache_folder, scan_date))
+
+    results = {name: df for name, (df, _) in zip(requests, outcomes)}
+    report = pd.DataFrame([record for _, record in outcomes])
+    return results, report
+
+
+def print_report(report):
+    print("\n--- Screener requests ---")
+    print(report.to_string(index=False))
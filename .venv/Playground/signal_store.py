@@ -0,0 +1,261 @@
+import pandas as pd
+from datetime import datetime, timezone
+from contextlib import contextmanager
+import argparse
+import json
+import os
+import sqlite3
+
+# --- CONFIGURATION ---
+DB_FILE = 'signals.db'
+OVERSOLD_SOURCE = 'finviz_oversold'  # Daily_Oversold_Stocks
+EVENTS_SOURCE = 'oversold_events'  # Firestore collection read by compare_strategies
+BATCH_SIZE = 400
+WRITE_TIME_FIELD = 'Created_At'  # per-document write timestamp; pull watermarks follow it
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    ticker TEXT NOT NULL,
+    scan_date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    pattern TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (ticker, scan_date, source, pattern)
+);
+CREATE INDEX IF NOT EXISTS idx_signals_date ON signals (source, scan_date);
+CREATE INDEX IF NOT EXISTS idx_signals_updated ON signals (source, updated_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    watermark TEXT NOT NULL
+);
+"""
+
+
+# --- 1. Connection ---
+def _migrate(conn):
+    # Stores created before the pattern column: rebuild the table with the wider key,
+    # taking the pattern from each payload's Pattern_Type
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(signals)")]
+    if not columns or 'pattern' in columns:
+        return
+    conn.executescript("""
+        DROP INDEX IF EXISTS idx_signals_date;
+        DROP INDEX IF EXISTS idx_signals_updated;
+        ALTER TABLE signals RENAME TO signals_old;
+    """)
+    conn.executescript(SCHEMA)
+    conn.execute("INSERT INTO signals (ticker, scan_date, source, pattern, payload, updated_at) "
+                 "SELECT ticker, scan_date, source, COALESCE(json_extract(payload, '$.Pattern_Type'), ''), "
+                 "payload, updated_at FROM signals_old")
+    conn.execute("DROP TABLE signals_old")
+    conn.commit()
+
+
+@contextmanager
+def connect(path=DB_FILE):
+    # Commits on success, rolls back on error, always closes
+    conn = sqlite3.connect(path)
+    try:
+        _migrate(conn)
+        conn.executescript(SCHEMA)
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def _date_str(value):
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def _pattern(record):
+    # Pattern_Scanner writes one document per ticker / day / pattern; other sources have none
+    value = record.get('Pattern_Type')
+    return value if isinstance(value, str) else ''
+
+
+def _utc_now():
+    # UTC everywhere: local time repeats an hour when DST ends, which breaks the watermarks
+    return datetime.now(timezone.utc)
+
+
+# --- 2. Writes (upsert on ticker + scan_date + source + pattern) ---
+def upsert_signals(df, source, path=DB_FILE):
+    # Every column of 'df' is kept in the JSON payload; Ticker and Scan_Date are required,
+    # Pattern_Type is part of the key when present.
+    # Re-running a scan for the same day overwrites instead of duplicating.
+    if df is None or df.empty:
+        return 0
+
+    now = _utc_now().isoformat()
+    records = df.to_dict(orient='records')
+    rows = [(r['Ticker'], _date_str(r['Scan_Date']), source, _pattern(r), json.dumps(r, default=str), now)
+            for r in records]
+
+    with connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO signals (ticker, scan_date, source, pattern, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (ticker, scan_date, source, pattern) DO UPDATE SET "
+            "payload = excluded.payload, updated_at = excluded.updated_at",
+            rows)
+    return len(rows)
+
+
+def import_csv(filename, source=OVERSOLD_SOURCE, path=DB_FILE):
+    # One-off migration of the old append-only oversold_history.csv
+    df = pd.read_csv(filename)
+    count = upsert_signals(df, source, path)
+    print(f"Imported {count} rows from {filename} ({df[['Ticker', 'Scan_Date']].drop_duplicates().shape[0]} unique)")
+    return count
+
+
+# --- 3. Reads (filters run inside SQLite, on the indexes above) ---
+def query_signals(source, start=None, end=None, tickers=None, path=DB_FILE):
+    sql = "SELECT payload, ticker, scan_date FROM signals WHERE source = ?"
+    params = [source]
+    if start is not None:
+        sql += " AND scan_date >= ?"
+        params.append(_date_str(start))
+    if end is not None:
+        sql += " AND scan_date <= ?"
+        params.append(_date_str(end))
+    if tickers is not None:
+        tickers = list(tickers)
+        sql += f" AND ticker IN ({','.join('?' * len(tickers))})"
+        params.extend(tickers)
+    sql += " ORDER BY scan_date, ticker"
+
+    with connect(path) as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    records = []
+    for payload, ticker, scan_date in rows:
+        record = json.loads(payload)
+        record['Ticker'] = ticker
+        record['Scan_Date'] = scan_date
+        records.append(record)
+    return pd.DataFrame(records, columns=None if records else ['Ticker', 'Scan_Date'])
+
+
+def latest_scan_dates(source, path=DB_FILE):
+    # {ticker: most recent scan_date} in a single grouped query
+    with connect(path) as conn:
+        rows = conn.execute("SELECT ticker, MAX(scan_date) FROM signals WHERE source = ? GROUP BY ticker",
+                            (source,)).fetchall()
+    return dict(rows)
+
+
+# --- 4. Firestore Sync (deltas only, tracked by watermarks) ---
+# 'db' is anything shaped like a firestore.Client: collection(name).where(field, op, value).stream(),
+# collection(name).document(id), batch().set(ref, data) / commit(). A fake or the emulator works too.
+def _get_watermark(conn, name):
+    row = conn.execute("SELECT watermark FROM sync_state WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_watermark(conn, name, value):
+    conn.execute("INSERT INTO sync_state (name, watermark) VALUES (?, ?) "
+                 "ON CONFLICT (name) DO UPDATE SET watermark = excluded.watermark", (name, value))
+
+
+def pull_from_firestore(db, collection, source=None, path=DB_FILE, time_field=WRITE_TIME_FIELD, full=False):
+    # Streams only documents written at or after the last pull, by their 'time_field' timestamp.
+    # Scan_Date is not a write time: a late write for an older scan day would never be seen.
+    # The boundary instant is re-read on purpose; those documents are upserted, not duplicated.
+    # A filtered query cannot see documents without 'time_field', so the watermark is only set
+    # after a full pull in which every document had it; while any do not, every pull is full.
+    source = source or collection
+    name = f"pull:{collection}"
+    with connect(path) as conn:
+        watermark = None if full else _get_watermark(conn, name)
+
+    query = db.collection(collection)
+    if watermark:
+        query = query.where(time_field, '>=', pd.Timestamp(watermark).to_pydatetime())
+    df = pd.DataFrame([d.to_dict() for d in query.stream()])
+
+    if df.empty:
+        print(f"Pulled 0 new documents from {collection}")
+        return 0
+
+    count = upsert_signals(df, source, path)
+    written = pd.to_datetime(df[time_field], utc=True, errors='coerce') if time_field in df.columns else None
+    with connect(path) as conn:
+        if written is not None and written.notna().all():
+            _set_watermark(conn, name, written.max().isoformat())
+        else:
+            unstamped = len(df) if written is None else int(written.isna().sum())
+            conn.execute("DELETE FROM sync_state WHERE name = ?", (name,))
+            print(f"{unstamped} documents in {collection} have no {time_field}; the next pull is a full one too")
+    print(f"Pulled {count} documents from {collection}")
+    return count
+
+
+def default_doc_id(record):
+    # Same ids as Pattern_Scanner (Ticker_Date_Pattern), Ticker_Date for sources without a pattern
+    pattern = _pattern(record).replace(' ', '')
+    return f"{record['Ticker']}_{record['Scan_Date']}" + (f"_{pattern}" if pattern else '')
+
+
+def push_to_firestore(db, collection, source, doc_id=None, path=DB_FILE):
+    # Writes only rows changed locally since the last push, stamped with the push time
+    # so pull_from_firestore on another machine picks them up
+    doc_id = doc_id or default_doc_id
+    name = f"push:{source}:{collection}"
+
+    with connect(path) as conn:
+        watermark = _get_watermark(conn, name) or ''
+        if watermark and '+' not in watermark:
+            # Written while updated_at was local time; it does not compare with UTC, so push everything once
+            watermark = ''
+        rows = conn.execute("SELECT payload, ticker, scan_date, updated_at FROM signals "
+                            "WHERE source = ? AND updated_at > ? ORDER BY updated_at",
+                            (source, watermark)).fetchall()
+
+    if not rows:
+        print(f"Nothing to push to {collection}")
+        return 0
+
+    pushed_at = _utc_now()
+    batch = db.batch()
+    for i, (payload, ticker, scan_date, updated_at) in enumerate(rows, start=1):
+        record = json.loads(payload)
+        record['Ticker'], record['Scan_Date'] = ticker, scan_date
+        record[WRITE_TIME_FIELD] = pushed_at
+        batch.set(db.collection(collection).document(doc_id(record)), record)
+        if i % BATCH_SIZE == 0:
+            batch.commit()
+            batch = db.batch()
+    batch.commit()
+
+    with connect(path) as conn:
+        _set_watermark(conn, name, rows[-1][3])
+    print(f"Pushed {len(rows)} rows to {collection}")
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local signal store utilities.")
+    parser.add_argument('--import-csv', metavar='FILE', help="Import an old oversold_history.csv")
+    parser.add_argument('--push', metavar='COLLECTION', help="Push rows changed since the last push to Firestore")
+    parser.add_argument('--pull', metavar='COLLECTION', help="Pull documents written since the last pull")
+    parser.add_argument('--full', action='store_true',
+                        help="With --pull: ignore the watermark and read the whole collection")
+    parser.add_argument('--source', default=None,
+                        help=f"Local source for --push / --pull (default: {OVERSOLD_SOURCE} / the collection name)")
+    args = parser.parse_args()
+
+    if args.import_csv:
+        if not os.path.exists(args.import_csv):
+            print(f"Error: '{args.import_csv}' not found.")
+        else:
+            import_csv(args.import_csv)
+
+    if args.push or args.pull:
+        # Cloud credentials are only needed for the sync commands
+        from compare_strategies import get_db
+        if args.pull:
+            pull_from_firestore(get_db(), args.pull, args.source, full=args.full)
+        if args.push:
+            push_to_firestore(get_db(), args.push, args.source or OVERSOLD_SOURCE)
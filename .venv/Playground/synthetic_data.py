@@ -0,0 +1,47 @@
+import pandas as pd
+import numpy as np
+
+# Deterministic OHLCV and signal fixtures for offline benchmarks and equivalence checks.
+# The same seed always produces the same data, so results can be compared run to run.
+
+
+def make_ohlcv(n_bars=665, seed=0, end='2025-12-31'):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end, periods=n_bars, name='Date')
+
+    # Random walk with regime changes, so RSI swings through 30 / 50 / 70
+    drift = np.repeat(rng.normal(0, 0.004, n_bars // 40 + 1), 40)[:n_bars]
+    close = 50 * np.exp(np.cumsum(drift + rng.normal(0, 0.02, n_bars)))
+    open_ = close * np.exp(rng.normal(0, 0.012, n_bars))
+
+    # Small bodies on a fraction of bars produce Doji / Hammer candles
+    flat = rng.random(n_bars) < 0.15
+    open_[flat] = close[flat] * (1 + rng.normal(0, 0.001, flat.sum()))
+
+    top = np.maximum(open_, close)
+    bottom = np.minimum(open_, close)
+    high = top * (1 + np.abs(rng.normal(0, 0.01, n_bars)))
+    low = bottom * (1 - np.abs(rng.normal(0, 0.01, n_bars)))
+    volume = rng.integers(500_000, 5_000_000, n_bars)
+
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low,
+                         'Close': close, 'Volume': volume}, index=index)
+
+
+def make_universe(n_tickers, n_bars=665, seed=0, end='2025-12-31'):
+    return {f"T{i:05d}": make_ohlcv(n_bars, seed=seed + i, end=end) for i in range(n_tickers)}
+
+
+def make_signals(universe, n_signals, seed=0, history_bars=250):
+    # Scan dates drawn from the last 'history_bars' bars of each ticker, sorted like the Firestore feed
+    rng = np.random.default_rng(seed)
+    tickers = np.array(list(universe))
+    picks = tickers[rng.integers(0, len(tickers), n_signals)]
+
+    dates = []
+    for ticker in picks:
+        index = universe[ticker].index
+        dates.append(index[rng.integers(max(len(index) - history_bars, 0), len(index))])
+
+    df_signals = pd.DataFrame({'Ticker': picks, 'Scan_Date': pd.DatetimeIndex(dates)})
+    return df_signals.sort_values(by='Scan_Date', kind='stable').reset_index(drop=True)
@@ -0,0 +1,67 @@
+import pandas as pd
+import numpy as np
+import pandas_ta_classic as ta
+import unittest
+
+from indicator_state import new_state, update_state, update_from_history
+from synthetic_data import make_ohlcv
+
+# Run with: python -m pytest test_indicator_state.py (or python -m unittest test_indicator_state)
+
+RSI_LENGTH, SMA_LENGTH = 14, 200
+
+
+class IndicatorStateTest(unittest.TestCase):
+    def setUp(self):
+        self.df = make_ohlcv(n_bars=600, seed=3)
+        self.rsi = ta.rsi(self.df['Close'], length=RSI_LENGTH)
+        self.sma = ta.sma(self.df['Close'], length=SMA_LENGTH)
+
+    def assert_matches_batch(self, state, i):
+        self.assertAlmostEqual(state['rsi'], self.rsi.iloc[i], delta=1e-9)
+        self.assertAlmostEqual(state['sma'], self.sma.iloc[i], delta=1e-9)
+
+    def test_streaming_matches_pandas_ta_on_every_bar(self):
+        state = new_state(RSI_LENGTH, SMA_LENGTH)
+        for i, (date, close) in enumerate(self.df['Close'].items()):
+            update_state(state, date, close)
+            if i >= SMA_LENGTH - 1:
+                self.assert_matches_batch(state, i)
+
+    def test_incremental_updates_match_one_pass(self):
+        # Yesterday's state plus today's bar equals streaming the whole history at once
+        state = update_from_history(new_state(RSI_LENGTH, SMA_LENGTH), self.df.iloc[:400])
+        update_from_history(state, self.df.iloc[390:])
+        self.assertEqual(state['last_date'], self.df.index[-1].strftime('%Y-%m-%d'))
+        self.assert_matches_batch(state, len(self.df) - 1)
+
+    def test_revised_bar_replaces_the_last_one(self):
+        # Every bar first arrives as a wrong partial value, then as the final close
+        state = new_state(RSI_LENGTH, SMA_LENGTH)
+        rng = np.random.default_rng(0)
+        for i, (date, close) in enumerate(self.df['Close'].items()):
+            update_state(state, date, close * (1 + rng.normal(0, 0.02)))
+            update_state(state, date, close)
+            if i >= SMA_LENGTH - 1:
+                self.assert_matches_batch(state, i)
+
+    def test_revision_without_undo_record_is_ignored(self):
+        state = update_from_history(new_state(RSI_LENGTH, SMA_LENGTH), self.df)
+        last = state['last_date']
+        # This revision uses the last bar's undo record and keeps none of its own...
+        update_state(state, last, 1.0, keep_previous=False)
+        # ...so a second one has nothing to restore and is dropped
+        update_state(state, last, 2.0)
+        self.assertEqual(state['last_date'], last)
+        self.assertIsNone(state['previous'])
+        self.assertEqual(state['last_close'], 1.0)
+
+    def test_older_bars_are_ignored(self):
+        state = update_from_history(new_state(RSI_LENGTH, SMA_LENGTH), self.df)
+        before = dict(state, window=list(state['window']))
+        update_state(state, self.df.index[-10], 1.0)
+        self.assertEqual(state, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
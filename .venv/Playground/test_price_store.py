@@ -0,0 +1,100 @@
+import pandas as pd
+from datetime import datetime, timedelta
+import os
+import tempfile
+import unittest
+
+from price_store import get_history, _load_index, MAX_EMPTY_FETCHES
+from synthetic_data import make_ohlcv
+
+# Run with: python -m pytest test_price_store.py (or python -m unittest test_price_store)
+
+
+class FakeProvider:
+    # Serves slices of fixed synthetic frames and records every request
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def __call__(self, tickers, start, end):
+        self.calls.append((list(tickers), pd.Timestamp(start), pd.Timestamp(end)))
+        out = {}
+        for t in tickers:
+            if t in self.frames:
+                df = self.frames[t].loc[start:end]
+                if not df.empty:
+                    out[t] = df
+        return out
+
+
+def days_ago(n):
+    return pd.Timestamp(datetime.today()).normalize() - timedelta(days=n)
+
+
+class PriceStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmp.name, 'price_cache')
+        # Last bar yesterday, so every bar in these tests is final
+        self.full = make_ohlcv(n_bars=600, seed=1, end=days_ago(1))
+        self.provider = FakeProvider({'AAA': self.full})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def get(self, start, end=None, tickers=('AAA',)):
+        # Ends yesterday by default: today's bar is always re-fetched while it may still be forming
+        return get_history(list(tickers), start, end or days_ago(1), provider=self.provider,
+                           cache_folder=self.cache)
+
+    def test_second_call_is_served_from_disk(self):
+        self.get(days_ago(300))
+        self.provider.calls.clear()
+        df = self.get(days_ago(300))['AAA']
+        self.assertEqual(self.provider.calls, [])
+        pd.testing.assert_frame_equal(df, self.full.loc[days_ago(300):], check_freq=False)
+
+    def test_older_disjoint_window_leaves_no_gap(self):
+        # Recent cache, then an older window ending before it, then the whole span
+        self.get(days_ago(100))
+        self.get(days_ago(700), days_ago(500))
+        df = self.get(days_ago(700))['AAA']
+
+        expected = self.full.loc[days_ago(700):]
+        self.assertEqual(len(df), len(expected))
+        pd.testing.assert_frame_equal(df, expected, check_freq=False)
+
+        start, end = _load_index(self.cache)['AAA']
+        self.assertLessEqual(start, days_ago(700))
+        self.assertGreaterEqual(end, days_ago(1))
+
+    def test_earlier_start_fetches_only_the_head(self):
+        self.get(days_ago(100))
+        self.provider.calls.clear()
+        self.get(days_ago(300))
+        self.assertEqual(len(self.provider.calls), 1)
+        _, start, end = self.provider.calls[0]
+        self.assertEqual(start, days_ago(300))
+        self.assertLess(end, days_ago(100))
+
+    def test_empty_fetch_is_not_marked_cached(self):
+        # The first bulk call drops the ticker; the next run must fetch its full history
+        flaky = {'calls': 0}
+
+        def provider(tickers, start, end):
+            flaky['calls'] += 1
+            return {} if flaky['calls'] == 1 else self.provider(tickers, start, end)
+
+        get_history(['AAA'], days_ago(200), provider=provider, cache_folder=self.cache)
+        self.assertNotIn('AAA', _load_index(self.cache))
+        df = get_history(['AAA'], days_ago(200), provider=provider, cache_folder=self.cache)['AAA']
+        self.assertEqual(len(df), len(self.full.loc[days_ago(200):]))
+
+    def test_dead_ticker_stops_being_fetched(self):
+        for _ in range(MAX_EMPTY_FETCHES + 2):
+            self.get(days_ago(30), tickers=['DEAD'])
+        self.assertEqual(len(self.provider.calls), MAX_EMPTY_FETCHES)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import pandas as pd
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from screener_fetch import fetch_screeners, PAGE_SIZE
+
+# Run with: python -m pytest test_screener_fetch.py (or python -m unittest test_screener_fetch)
+
+FAST = {'rate': 1000, 'burst': 1000, 'backoff': 0.01}  # no waiting unless a test wants it
+
+
+def page(n, start=0):
+    return pd.DataFrame({'Ticker': [f"T{i:03d}" for i in range(start, start + n)]})
+
+
+class FakeFetcher:
+    # fetcher(view, filters_dict, page) backed by a list of pages per request name;
+    # leading Exception entries are raised (one per call) before any page is served
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, view, filters_dict, page_number):
+        name = filters_dict['name']
+        with self.lock:
+            self.calls.append((name, page_number, time.monotonic()))
+            pages = self.pages[name]
+            if pages and isinstance(pages[0], Exception):
+                raise pages.pop(0)
+        return pages[page_number - 1] if page_number <= len(pages) else None
+
+
+def requests_for(*names):
+    return {name: ('overview', {'name': name}) for name in names}
+
+
+class ScreenerFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = os.path.join(self.tmp.name, 'screener_cache')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def fetch(self, fetcher, names, cache_folder=None, **kwargs):
+        options = dict(FAST, retries=2, cache_folder=cache_folder, scan_date='2024-01-02')
+        options.update(kwargs)
+        return fetch_screeners(requests_for(*names), fetcher=fetcher, **options)
+
+    def test_pages_until_a_short_page(self):
+        fetcher = FakeFetcher({'A': [page(PAGE_SIZE), page(PAGE_SIZE, PAGE_SIZE), page(5, 2 * PAGE_SIZE)]})
+        results, report = self.fetch(fetcher, ['A'])
+        self.assertEqual(len(results['A']), 2 * PAGE_SIZE + 5)
+        self.assertTrue(results['A']['Ticker'].is_unique)
+        self.assertEqual(report.loc[0, 'Pages'], 3)
+        self.assertEqual([p for _, p, _ in fetcher.calls], [1, 2, 3])
+
+    def test_pages_until_an_empty_page(self):
+        fetcher = FakeFetcher({'A': [page(PAGE_SIZE)]})  # page 2 is None
+        results, report = self.fetch(fetcher, ['A'])
+        self.assertEqual(len(results['A']), PAGE_SIZE)
+        self.assertEqual(report.loc[0, 'Pages'], 2)
+
+    def test_retries_with_backoff_after_errors(self):
+        fetcher = FakeFetcher({'A': [ConnectionError('reset'), ConnectionError('reset'), page(3)]})
+        results, report = self.fetch(fetcher, ['A'], backoff=0.05)
+        self.assertEqual(len(results['A']), 3)
+        self.assertEqual(report.loc[0, 'Attempts'], 3)
+        self.assertEqual(report.loc[0, 'Error'], '')
+
+        # Waits 0.05s, then at least 0.1s (doubling) between attempts
+        times = [t for _, _, t in fetcher.calls]
+        self.assertGreaterEqual(times[1] - times[0], 0.05)
+        self.assertGreaterEqual(times[2] - times[1], 0.1)
+
+    def test_gives_up_after_retries_and_keeps_the_error(self):
+        fetcher = FakeFetcher({'A': [ConnectionError('down')] * 3, 'B': [page(2)]})
+        results, report = self.fetch(fetcher, ['A', 'B'])
+        self.assertIsNone(results['A'])
+        self.assertEqual(len(results['B']), 2)
+        record = report.set_index('Request').loc['A']
+        self.assertEqual(record['Attempts'], 3)
+        self.assertIn('ConnectionError: down', record['Error'])
+
+    def test_rate_limit_spaces_every_page(self):
+        # Three requests of two pages each: six HTTP calls, all through the bucket
+        pages = {name: [page(PAGE_SIZE), page(1)] for name in 'ABC'}
+        fetcher = FakeFetcher(pages)
+        rate = 20
+        start = time.monotonic()
+        self.fetch(fetcher, list(pages), rate=rate, burst=1)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(len(fetcher.calls), 6)
+        times = sorted(t for _, _, t in fetcher.calls)
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        self.assertGreaterEqual(min(gaps), 1 / rate * 0.8)
+        self.assertGreaterEqual(elapsed, 5 / rate * 0.9)
+
+    def test_empty_results_are_not_cached(self):
+        fetcher = FakeFetcher({'A': [], 'B': [page(4)]})
+        results, _ = self.fetch(fetcher, ['A', 'B'], cache_folder=self.cache)
+        self.assertIsNone(results['A'])
+        self.assertEqual(len(os.listdir(self.cache)), 1)  # only B
+
+        # The next run asks Finviz again for A, but serves B from the cache
+        fetcher.calls.clear()
+        fetcher.pages['A'] = [page(2)]
+        results, report = self.fetch(fetcher, ['A', 'B'], cache_folder=self.cache)
+        self.assertEqual(len(results['A']), 2)
+        self.assertEqual({name for name, _, _ in fetcher.calls}, {'A'})
+        self.assertTrue(report.set_index('Request').loc['B', 'Cached'])
+
+
+if __name__ == "__main__":
+    unittest.main()
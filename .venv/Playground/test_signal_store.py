@@ -0,0 +1,248 @@
+import pandas as pd
+from datetime import datetime, timezone
+import operator
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from signal_store import (upsert_signals, query_signals, pull_from_firestore, push_to_firestore,
+                          _get_watermark, _set_watermark, connect, WRITE_TIME_FIELD)
+
+# Run with: python -m pytest test_signal_store.py (or python -m unittest test_signal_store)
+
+
+# --- In-memory Firestore (only the calls signal_store makes) ---
+OPS = {'>=': operator.ge, '>': operator.gt, '<=': operator.le, '<': operator.lt, '==': operator.eq}
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self.data = data
+
+    def to_dict(self):
+        return dict(self.data)
+
+
+class FakeQuery:
+    def __init__(self, docs, filters=()):
+        self.docs = docs
+        self.filters = filters
+
+    def where(self, field, op, value):
+        return FakeQuery(self.docs, self.filters + ((field, op, value),))
+
+    def stream(self):
+        # Like Firestore, a filter on a field skips documents that do not have it
+        for data in list(self.docs.values()):
+            if all(field in data and OPS[op](data[field], value) for field, op, value in self.filters):
+                yield FakeSnapshot(data)
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id):
+        return (self.docs, doc_id)
+
+
+class FakeBatch:
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, ref, data):
+        self.writes.append((ref, dict(data)))
+
+    def commit(self):
+        for (docs, doc_id), data in self.writes:
+            docs[doc_id] = data
+        self.db.commits += 1
+        self.writes = []
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.collections = {}
+        self.commits = 0
+
+    def collection(self, name):
+        return FakeCollection(self.collections.setdefault(name, {}))
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def put(self, collection, doc_id, **data):
+        self.collections.setdefault(collection, {})[doc_id] = data
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+# --- Tests ---
+class SignalStoreSyncTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'signals.db')
+        self.db = FakeFirestore()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def watermark(self, name):
+        with connect(self.path) as conn:
+            return _get_watermark(conn, name)
+
+    def test_pull_upserts_and_sets_write_time_watermark(self):
+        self.db.put('events', 'AAA_2024-01-02', Ticker='AAA', Scan_Date='2024-01-02', RSI=25.0,
+                    Created_At=utc(2024, 1, 2, 22))
+        self.db.put('events', 'BBB_2024-01-03', Ticker='BBB', Scan_Date='2024-01-03', RSI=28.0,
+                    Created_At=utc(2024, 1, 3, 22))
+
+        self.assertEqual(pull_from_firestore(self.db, 'events', path=self.path), 2)
+        self.assertEqual(len(query_signals('events', path=self.path)), 2)
+        self.assertEqual(pd.Timestamp(self.watermark('pull:events')), pd.Timestamp(utc(2024, 1, 3, 22)))
+
+    def test_pull_sees_late_write_for_an_older_scan_date(self):
+        self.db.put('events', 'BBB_2024-01-03', Ticker='BBB', Scan_Date='2024-01-03', RSI=28.0,
+                    Created_At=utc(2024, 1, 3, 22))
+        pull_from_firestore(self.db, 'events', path=self.path)
+
+        # Backfilled later for an earlier day: a Scan_Date watermark would skip it
+        self.db.put('events', 'AAA_2024-01-01', Ticker='AAA', Scan_Date='2024-01-01', RSI=22.0,
+                    Created_At=utc(2024, 1, 4, 9))
+        pull_from_firestore(self.db, 'events', path=self.path)
+
+        df = query_signals('events', path=self.path)
+        self.assertEqual(sorted(df['Ticker']), ['AAA', 'BBB'])
+        self.assertEqual(pd.Timestamp(self.watermark('pull:events')), pd.Timestamp(utc(2024, 1, 4, 9)))
+
+    def test_pull_is_incremental_and_rewrites_do_not_duplicate(self):
+        self.db.put('events', 'AAA_2024-01-02', Ticker='AAA', Scan_Date='2024-01-02', RSI=25.0,
+                    Created_At=utc(2024, 1, 2, 22))
+        pull_from_firestore(self.db, 'events', path=self.path)
+
+        # Only the boundary document comes back; nothing older is re-streamed
+        self.db.put('events', 'OLD_2023-12-01', Ticker='OLD', Scan_Date='2023-12-01', RSI=20.0,
+                    Created_At=utc(2023, 12, 1, 22))
+        self.assertEqual(pull_from_firestore(self.db, 'events', path=self.path), 1)
+
+        # Same document rewritten with a new value and write time: updated in place
+        self.db.put('events', 'AAA_2024-01-02', Ticker='AAA', Scan_Date='2024-01-02', RSI=31.0,
+                    Created_At=utc(2024, 1, 5, 8))
+        pull_from_firestore(self.db, 'events', path=self.path)
+
+        df = query_signals('events', path=self.path)
+        self.assertEqual(list(df['Ticker']), ['AAA'])
+        self.assertEqual(df['RSI'].iloc[0], 31.0)
+
+    def test_documents_without_write_time_do_not_advance_watermark(self):
+        self.db.put('events', 'AAA_2024-01-02', Ticker='AAA', Scan_Date='2024-01-02', RSI=25.0)
+        self.assertEqual(pull_from_firestore(self.db, 'events', path=self.path), 1)
+        self.assertIsNone(self.watermark('pull:events'))
+
+    def test_mixed_documents_keep_pulls_full(self):
+        # An older writer without Created_At shares the collection with stamped documents
+        self.db.put('events', 'AAA_2024-01-02', Ticker='AAA', Scan_Date='2024-01-02', RSI=25.0)
+        self.db.put('events', 'BBB_2024-01-03', Ticker='BBB', Scan_Date='2024-01-03', RSI=28.0,
+                    Created_At=utc(2024, 1, 3, 22))
+        self.assertEqual(pull_from_firestore(self.db, 'events', path=self.path), 2)
+        self.assertIsNone(self.watermark('pull:events'))
+
+        # The unstamped writer adds another document: a filtered pull would never see it
+        self.db.put('events', 'CCC_2024-01-04', Ticker='CCC', Scan_Date='2024-01-04', RSI=21.0)
+        pull_from_firestore(self.db, 'events', path=self.path)
+        self.assertEqual(sorted(query_signals('events', path=self.path)['Ticker']), ['AAA', 'BBB', 'CCC'])
+
+    def test_stamped_collection_falls_back_to_full_pull_when_unstamped_docs_appear(self):
+        self.db.put('events', 'BBB_2024-01-03', Ticker='BBB', Scan_Date='2024-01-03', RSI=28.0,
+                    Created_At=utc(2024, 1, 3, 22))
+        pull_from_firestore(self.db, 'events', path=self.path)
+        self.assertIsNotNone(self.watermark('pull:events'))
+
+        # Only a forced full pull can find a late unstamped document; it then drops the watermark
+        self.db.put('events', 'AAA_2024-01-04', Ticker='AAA', Scan_Date='2024-01-04', RSI=25.0)
+        pull_from_firestore(self.db, 'events', path=self.path, full=True)
+        self.assertIsNone(self.watermark('pull:events'))
+        self.assertEqual(sorted(query_signals('events', path=self.path)['Ticker']), ['AAA', 'BBB'])
+
+    def test_patterns_for_the_same_ticker_and_day_stay_separate(self):
+        for pattern in ('Hammer', 'Long Lower Shadow'):
+            self.db.put('pattern_signals', f"AAA_2024-01-02_{pattern.replace(' ', '')}", Ticker='AAA',
+                        Scan_Date='2024-01-02', Pattern_Type=pattern, Created_At=utc(2024, 1, 2, 22))
+        self.assertEqual(pull_from_firestore(self.db, 'pattern_signals', path=self.path), 2)
+        df = query_signals('pattern_signals', path=self.path)
+        self.assertEqual(sorted(df['Pattern_Type']), ['Hammer', 'Long Lower Shadow'])
+
+        push_to_firestore(self.db, 'mirror', 'pattern_signals', path=self.path)
+        self.assertEqual(sorted(self.db.collections['mirror']),
+                         ['AAA_2024-01-02_Hammer', 'AAA_2024-01-02_LongLowerShadow'])
+
+    def test_old_store_is_migrated_to_the_pattern_key(self):
+        conn = sqlite3.connect(self.path)
+        conn.executescript("""
+            CREATE TABLE signals (ticker TEXT NOT NULL, scan_date TEXT NOT NULL, source TEXT NOT NULL,
+                                  payload TEXT NOT NULL, updated_at TEXT NOT NULL,
+                                  PRIMARY KEY (ticker, scan_date, source));
+        """)
+        conn.execute("INSERT INTO signals VALUES ('AAA', '2024-01-02', 'p', ?, '2024-01-02T10:00:00')",
+                     (json.dumps({'Ticker': 'AAA', 'Scan_Date': '2024-01-02', 'Pattern_Type': 'Hammer'}),))
+        conn.commit()
+        conn.close()
+
+        upsert_signals(pd.DataFrame({'Ticker': ['AAA'], 'Scan_Date': ['2024-01-02'],
+                                     'Pattern_Type': ['Doji']}), 'p', self.path)
+        self.assertEqual(sorted(query_signals('p', path=self.path)['Pattern_Type']), ['Doji', 'Hammer'])
+
+    def test_local_time_push_watermark_pushes_everything_once(self):
+        df = pd.DataFrame({'Ticker': ['AAA'], 'Scan_Date': ['2024-01-02'], 'RSI': [25.0]})
+        upsert_signals(df, 'local', self.path)
+        with connect(self.path) as conn:
+            # A naive watermark far in the future would hide every UTC row
+            _set_watermark(conn, 'push:local:remote', '2999-01-01T00:00:00')
+        self.assertEqual(push_to_firestore(self.db, 'remote', 'local', path=self.path), 1)
+
+    def test_push_sends_only_changed_rows_with_write_time(self):
+        df = pd.DataFrame({'Ticker': ['AAA', 'BBB'], 'Scan_Date': ['2024-01-02', '2024-01-02'], 'RSI': [25.0, 28.0]})
+        upsert_signals(df, 'local', self.path)
+
+        before = datetime.now(timezone.utc)
+        self.assertEqual(push_to_firestore(self.db, 'remote', 'local', path=self.path), 2)
+        docs = self.db.collections['remote']
+        self.assertEqual(sorted(docs), ['AAA_2024-01-02', 'BBB_2024-01-02'])
+        self.assertTrue(all(d[WRITE_TIME_FIELD] >= before for d in docs.values()))
+
+        # Nothing changed locally: nothing pushed
+        self.assertEqual(push_to_firestore(self.db, 'remote', 'local', path=self.path), 0)
+
+        # One row re-scanned: only that row goes out
+        upsert_signals(df.iloc[[1]].assign(RSI=29.0), 'local', self.path)
+        self.assertEqual(push_to_firestore(self.db, 'remote', 'local', path=self.path), 1)
+        self.assertEqual(docs['BBB_2024-01-02']['RSI'], 29.0)
+
+    def test_push_then_pull_round_trip(self):
+        df = pd.DataFrame({'Ticker': ['AAA'], 'Scan_Date': ['2024-01-02'], 'RSI': [25.0]})
+        upsert_signals(df, 'local', self.path)
+        push_to_firestore(self.db, 'remote', 'local', path=self.path)
+
+        other = os.path.join(self.tmp.name, 'other.db')
+        self.assertEqual(pull_from_firestore(self.db, 'remote', path=other), 1)
+        self.assertEqual(query_signals('remote', path=other)['RSI'].iloc[0], 25.0)
+
+        # A later push is seen by the other machine's next pull
+        upsert_signals(df.assign(RSI=27.0, Scan_Date='2024-01-03'), 'local', self.path)
+        push_to_firestore(self.db, 'remote', 'local', path=self.path)
+        self.assertEqual(pull_from_firestore(self.db, 'remote', path=other), 2)  # boundary doc re-read
+        self.assertEqual(len(query_signals('remote', path=other)), 2)
+
+    def test_push_commits_in_batches(self):
+        n = 1000
+        df = pd.DataFrame({'Ticker': [f"T{i:04d}" for i in range(n)], 'Scan_Date': '2024-01-02', 'RSI': 25.0})
+        upsert_signals(df, 'local', self.path)
+        push_to_firestore(self.db, 'remote', 'local', path=self.path)
+        self.assertEqual(len(self.db.collections['remote']), n)
+        self.assertEqual(self.db.commits, 3)  # 400 + 400 + 200
+
+
+if __name__ == "__main__":
+    unittest.main()
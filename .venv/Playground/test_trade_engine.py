@@ -0,0 +1,34 @@
+import pandas as pd
+import unittest
+
+from synthetic_data import make_signals
+from trade_engine import simulate_signals
+from compare_strategies import simulate_signals_loop
+from bench_trade_engine import build_market_data, check_identical
+
+# Run with: python -m pytest test_trade_engine.py (or python -m unittest test_trade_engine)
+# A small seeded version of bench_trade_engine's check, so engine regressions fail fast.
+
+N_SIGNALS = 200
+N_TICKERS = 20
+
+
+class TradeEngineTest(unittest.TestCase):
+    def test_vectorized_engine_matches_the_loop(self):
+        for seed in (0, 1):
+            with self.subTest(seed=seed):
+                market_data = build_market_data(N_TICKERS, seed=seed)
+                df_signals = make_signals(market_data, N_SIGNALS, seed=seed)
+
+                loop_strats, loop_inspect = simulate_signals_loop(df_signals, market_data)
+                fast_strats, fast_inspect = simulate_signals(df_signals, market_data)
+
+                check_identical((loop_strats, loop_inspect), (fast_strats, fast_inspect))
+                self.assertEqual(list(loop_strats), list(fast_strats))
+                self.assertGreater(sum(len(trades) for trades in fast_strats.values()), 0)
+                for name in loop_strats:
+                    pd.testing.assert_frame_equal(pd.DataFrame(fast_strats[name]), pd.DataFrame(loop_strats[name]))
+
+
+if __name__ == "__main__":
+    unittest.main()
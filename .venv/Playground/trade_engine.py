@@ -0,0 +1,196 @@
+import pandas as pd
+import numpy as np
+
+from candle_patterns import (detect_patterns, PATTERN_NAMES, NO_PATTERN, STANDARD_DOJI,
+                             DRAGONFLY_DOJI, GRAVESTONE_DOJI, HAMMER, ENGULFING, DOJI_CODES)
+from profiling import get_profiler
+
+# --- CONFIGURATION ---
+STOP_LOSS_PCT = 0.10
+PATTERN_LOOKAHEAD = 5
+
+STRATEGY_NAMES = [
+    'Runner (200 SMA Filter)',
+    'Engulfing',
+    'Raw Doji',
+    'Confirmed Doji',
+    'Raw Hammer',
+    'Confirmed Hammer'
+]
+RUNNER, ENGULF, RAW_DOJI, CONF_DOJI, RAW_HAMMER, CONF_HAMMER = range(6)
+
+
+# --- 1. Per-Ticker Precomputation ---
+def next_true_index(mask):
+    # For every bar j: the first index >= j where mask is True, or -1 if it never is
+    hits = np.flatnonzero(mask)
+    if len(hits) == 0:
+        return np.full(len(mask), -1)
+    pos = np.searchsorted(hits, np.arange(len(mask)))
+    return np.where(pos < len(hits), hits[np.minimum(pos, len(hits) - 1)], -1)
+
+
+def prepare_ticker(df, patterns=None):
+    # Every array the trade resolver needs, computed once per ticker.
+    # 'patterns' can be passed in when the caller already labelled the bars.
+    o = df['Open'].to_numpy(dtype=float)
+    h = df['High'].to_numpy(dtype=float)
+    l = df['Low'].to_numpy(dtype=float)
+    c = df['Close'].to_numpy(dtype=float)
+    rsi = df['RSI'].to_numpy(dtype=float)
+    if patterns is None:
+        patterns = detect_patterns(o, h, l, c)
+
+    return {
+        'index': df.index,
+        'open': o, 'high': h, 'close': c,
+        'sma': df['SMA_200'].to_numpy(dtype=float),
+        'patterns': patterns,
+        'next_50': next_true_index(rsi > 50),
+        'next_70': next_true_index(rsi > 70),
+        # Lowest Low from bar j to the end: a stop-loss breach after entry j is one lookup
+        'future_low': np.fmin.accumulate(l[::-1])[::-1],
+    }
+
+
+# --- 2. Trade Resolution ---
+def _exit_at(next_idx, start, last):
+    # First RSI crossing at or after 'start', else the last bar
+    exit_idx = next_idx[start]
+    return np.where(exit_idx >= 0, exit_idx, last)
+
+
+def _apply_stop_loss(entry_price, future_low, target_ret):
+    sl_price = entry_price * (1 - STOP_LOSS_PCT)
+    return np.where(future_low < sl_price, -100 * STOP_LOSS_PCT, target_ret)
+
+
+def _ticker_candidates(arrays, scan_pos, sig_order):
+    # Builds every candidate trade for one ticker as flat arrays.
+    # Returns rows of (sig_order, bar, strategy, dedup_pos, exit_pos, ret, pattern, date_pos)
+    n = len(arrays['close'])
+    last = n - 1
+    o, h, c = arrays['open'], arrays['high'], arrays['close']
+    parts = []
+
+    ok = scan_pos < n - 1
+    scan_pos, sig_order = scan_pos[ok], sig_order[ok]
+
+    # A. Runner (entry next open, 75% out at RSI>50, 25% at RSI>70)
+    sma = arrays['sma'][scan_pos]
+    take = ~np.isnan(sma) & (c[scan_pos] > sma)
+    s = scan_pos[take]
+    entry = s + 1
+    exit_50 = _exit_at(arrays['next_50'], entry, last)
+    hit_70 = arrays['next_70'][entry]
+    exit_70 = np.where(hit_70 >= 0, hit_70, last)
+    avg_exit = (0.75 * c[exit_50]) + (0.25 * c[exit_70])
+    ret = ((avg_exit - o[entry]) / o[entry]) * 100
+    ret = _apply_stop_loss(o[entry], arrays['future_low'][entry], ret)
+    exit_pos = np.where((hit_70 >= 0) & (exit_70 > exit_50), exit_70, exit_50)
+    parts.append((sig_order[take], np.full(len(s), -1), np.full(len(s), RUNNER),
+                  entry, exit_pos, ret, np.full(len(s), NO_PATTERN), s))
+
+    # B. Pattern bars in the lookahead window after each signal
+    offsets = np.arange(PATTERN_LOOKAHEAD + 1)
+    bars = (scan_pos[:, None] + offsets[None, :]).ravel()
+    orders = np.repeat(sig_order, len(offsets))
+    valid = (bars <= n - 3) & (bars != 0)
+    bars, orders = bars[valid], orders[valid]
+    codes = arrays['patterns'][bars]
+    has = codes != NO_PATTERN
+    bars, orders, codes = bars[has], orders[has], codes[has]
+
+    # Raw entry: next open, exit at RSI>50
+    raw_entry = bars + 1
+    raw_exit = _exit_at(arrays['next_50'], raw_entry, last)
+    raw_ret = ((c[raw_exit] - o[raw_entry]) / o[raw_entry]) * 100
+    raw_ret = _apply_stop_loss(o[raw_entry], arrays['future_low'][raw_entry], raw_ret)
+
+    # Confirmed entry: next bar makes a higher high, enter at its close
+    confirmed = h[bars + 1] > h[bars]
+    conf_entry = bars + 1
+    conf_exit = _exit_at(arrays['next_50'], np.minimum(bars + 2, last), last)
+    conf_ret = ((c[conf_exit] - c[conf_entry]) / c[conf_entry]) * 100
+    conf_ret = _apply_stop_loss(c[conf_entry], arrays['future_low'][np.minimum(bars + 2, last)], conf_ret)
+
+    is_doji = np.isin(codes, DOJI_CODES)
+    is_hammer = codes == HAMMER
+    for strategy, take, exit_pos, ret in [
+        (ENGULF, codes == ENGULFING, raw_exit, raw_ret),
+        (RAW_DOJI, is_doji, raw_exit, raw_ret),
+        (CONF_DOJI, is_doji & confirmed, conf_exit, conf_ret),
+        (RAW_HAMMER, is_hammer, raw_exit, raw_ret),
+        (CONF_HAMMER, is_hammer & confirmed, conf_exit, conf_ret),
+    ]:
+        k = take.sum()
+        parts.append((orders[take], bars[take], np.full(k, strategy), raw_entry[take],
+                      exit_pos[take], ret[take], codes[take], bars[take]))
+
+    return [np.concatenate(col) for col in zip(*parts)]
+
+
+def simulate_signals(df_signals, market_data, profiler=None):
+    # Vectorized replacement for the per-row loop in compare_strategies.
+    # Returns ({strategy: [{'Return': r}, ...]}, inspection_list) in the same order as the loop.
+    strategies = {k: [] for k in STRATEGY_NAMES}
+    inspection_list = []
+    profiler = get_profiler(profiler)
+
+    scan_dates = pd.DatetimeIndex(df_signals['Scan_Date'])
+    groups = df_signals.groupby('Ticker', sort=False).indices
+
+    columns = []
+    for ticker, rows in groups.items():
+        if ticker not in market_data:
+            continue
+        df = market_data[ticker]
+        scan_pos = df.index.get_indexer(scan_dates[rows])
+        found = scan_pos >= 0
+
+        with profiler.ticker('patterns', ticker):
+            patterns = detect_patterns(df['Open'], df['High'], df['Low'], df['Close'])
+        with profiler.ticker('trade arrays', ticker):
+            arrays = prepare_ticker(df, patterns)
+        cols = _ticker_candidates(arrays, scan_pos[found], rows[found])
+        columns.append((ticker, arrays['index'], cols))
+
+    if not columns:
+        return strategies, inspection_list
+
+    # Merge all tickers back into the loop's visiting order: signal, bar, strategy
+    ticker_ids = np.concatenate([np.full(len(cols[0]), t) for t, (_, _, cols) in enumerate(columns)])
+    orders, bars, strats, dedup_pos, exit_pos, rets, codes, date_pos = \
+        [np.concatenate([cols[i] for _, _, cols in columns]) for i in range(8)]
+    dates = np.concatenate([np.asarray(index[cols[7]].strftime('%Y-%m-%d'), dtype=object)
+                            for _, index, cols in columns])
+    visit = np.lexsort((strats, bars, orders))
+
+    # Deduplication: a new trade only opens after the previous one (same strategy, ticker) exited.
+    # This is the only sequential step and it runs on plain ints.
+    keep = []
+    last_exits = {}
+    strat_list, ticker_list = strats.tolist(), ticker_ids.tolist()
+    dedup_list, exit_list = dedup_pos.tolist(), exit_pos.tolist()
+    for j in visit.tolist():
+        key = (strat_list[j], ticker_list[j])
+        if key in last_exits and dedup_list[j] <= last_exits[key]:
+            continue
+        last_exits[key] = exit_list[j]
+        keep.append(j)
+
+    labels = {(RUNNER, NO_PATTERN): 'RUNNER', (RAW_HAMMER, HAMMER): 'Raw Hammer',
+              (CONF_HAMMER, HAMMER): 'Conf Hammer', (ENGULF, ENGULFING): 'Engulfing'}
+    for code in (STANDARD_DOJI, DRAGONFLY_DOJI, GRAVESTONE_DOJI):
+        labels[(RAW_DOJI, code)] = f"Raw {PATTERN_NAMES[code]}"
+        labels[(CONF_DOJI, code)] = f"Conf {PATTERN_NAMES[code]}"
+
+    ticker_names = [ticker for ticker, _, _ in columns]
+    code_list, ret_list, date_list = codes.tolist(), rets.tolist(), dates.tolist()
+    for j in keep:
+        strategy = strat_list[j]
+        strategies[STRATEGY_NAMES[strategy]].append({'Return': ret_list[j]})
+        inspection_list.append({'Ticker': ticker_names[ticker_list[j]], 'Date': date_list[j],
+                                'Pattern': labels[(strategy, code_list[j])], 'Result': ret_list[j]})
+
+    return strategies, inspection_list